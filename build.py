@@ -15,7 +15,6 @@ import argparse
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from config import APP_VERSION, BUILD_CONFIG
-from core.builder import Builder, build_modules
 
 
 def main():
@@ -84,6 +83,8 @@ def main():
         print(f"[INFO] Выходной файл: {output_file}")
     print()
     
+    # Ядро импортируется только для сборки (--help и --version его не загружают)
+    from core.builder import build_modules
     success = build_modules(modules_dir, output_file, config)
     
     if success:
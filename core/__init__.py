@@ -6,7 +6,7 @@ FSA-ProjectBuilder - Ядро системы
 __version__ = "0.1.0"
 
 # Экспорт основных классов
-from .parser import CodeParser, parse_file
+from .parser import CodeParser, parse_file, parse_files
 from .dependency_resolver import DependencyResolver
 from .rebuilder import Rebuilder, rebuild_file
 from .builder import Builder, build_modules
@@ -14,6 +14,7 @@ from .builder import Builder, build_modules
 __all__ = [
     'CodeParser',
     'parse_file',
+    'parse_files',
     'DependencyResolver',
     'Rebuilder',
     'rebuild_file',
@@ -7,15 +7,145 @@ FSA-ProjectBuilder - Сборка модулей в один файл
 Компания: ООО "НПА Вира-Реалтайм"
 """
 
-from __future__ import print_function
+from __future__ import print_function, annotations
 import os
 import json
 import re
-import time
-from typing import Dict, List, Optional, Any
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Any
 from .dependency_resolver import DependencyResolver
 from config import DEFAULT_MODULES_DIR, DEFAULT_METADATA_DIR, BUILD_CONFIG
 
+# Быстрый парсер JSON (опционально), при отсутствии - стандартный json
+try:
+    import orjson as _json_fast
+except ImportError:
+    _json_fast = None
+
+# Открывающие/закрывающие тройные кавычки docstring
+_TRIPLE_QUOTE_RE = re.compile(r'"""|\'\'\'')
+
+# Локальные импорты ('from . import x' и 'from .module import x')
+_LOCAL_IMPORT_RE = re.compile(r'^from \.\w* import .*$', re.MULTILINE)
+
+# Кэш разобранных модулей в директории метаданных
+PARSE_CACHE_FILE = 'parse_cache.json'
+PARSE_CACHE_VERSION = 1
+
+# Кэш порядка загрузки модулей (по сигнатуре имен и mtime модулей)
+ORDER_CACHE_FILE = 'order_cache.json'
+ORDER_CACHE_VERSION = 1
+
+# Разбор модулей в отдельных процессах имеет смысл только начиная с этого
+# числа модулей: иначе запуск процессов дороже самого разбора
+PROCESS_POOL_MIN_MODULES = 32
+PROCESS_POOL_CHUNKSIZE = 8
+
+# Размер буфера записи выходного файла
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+# Группы импортов по имени модуля верхнего уровня
+STDLIB = frozenset({
+    'os', 'sys', 'json', 're', 'typing', 'abc', 'collections', 'datetime', 'threading',
+    'queue', 'tempfile', 'shutil', 'subprocess', 'hashlib', 'time', 'traceback'
+})
+THIRD_PARTY = frozenset({'tkinter', 'requests', 'psutil'})
+
+
+def _top_module(imp: str) -> str:
+    """Имя модуля верхнего уровня из строки импорта ('from os.path import x' -> 'os')"""
+    tokens = imp.split()
+    if len(tokens) < 2:
+        return ''
+    return tokens[1].lstrip('.').split('.', 1)[0].rstrip(',')
+
+
+def _load_json(path: str) -> Any:
+    """Чтение JSON файла (через orjson, если он установлен)"""
+    if _json_fast is not None:
+        with open(path, 'rb') as f:
+            return _json_fast.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _extract_imports_and_code(content: str) -> Tuple[List[str], str]:
+    """
+    Извлечение импортов и кода из модуля
+    
+    Функция модульного уровня, чтобы ее можно было выполнять в ProcessPoolExecutor.
+    
+    Returns:
+        tuple: (imports_list, code_without_imports)
+    """
+    imports = []
+    code_lines = []
+    
+    # Диапазоны строк в тройных кавычках находим одним проходом регулярного
+    # выражения, а не тремя поисками подстроки на каждой строке
+    docstring_ranges = _find_docstring_ranges(content)
+    range_index = 0
+    offset = 0
+    
+    for i, line in enumerate(content.splitlines(keepends=True)):
+        line_start = offset
+        offset += len(line)
+        
+        # Пропускаем shebang и encoding
+        if i == 0 and line.lstrip().startswith(('#!', '# -*-')):
+            continue
+        
+        # Пропускаем диапазоны, которые закончились до начала строки
+        while range_index < len(docstring_ranges) and docstring_ranges[range_index][1] <= line_start:
+            range_index += 1
+        
+        in_docstring = (range_index < len(docstring_ranges)
+                        and docstring_ranges[range_index][0] < line_start)
+        
+        # Собираем импорты (только если не в docstring)
+        if not in_docstring and line.lstrip().startswith(('import ', 'from ')):
+            imports.append(line.rstrip('\n'))
+            continue
+        
+        # Остальной код
+        code_lines.append(line)
+    
+    code = ''.join(code_lines)
+    return imports, code
+
+
+def _find_docstring_ranges(content: str) -> List[Tuple[int, int]]:
+    """
+    Поиск диапазонов текста в тройных кавычках
+    
+    Args:
+        content: Исходный код модуля
+    
+    Returns:
+        List[Tuple[int, int]]: Отсортированные пары (начало, конец) в символах
+    """
+    ranges = []
+    open_quote = None
+    open_pos = 0
+    
+    for match in _TRIPLE_QUOTE_RE.finditer(content):
+        quote = match.group()
+        if open_quote is None:
+            # Начало docstring
+            open_quote = quote
+            open_pos = match.start()
+        elif quote == open_quote:
+            # Конец docstring
+            ranges.append((open_pos, match.end()))
+            open_quote = None
+    
+    # Незакрытый docstring тянется до конца файла
+    if open_quote is not None:
+        ranges.append((open_pos, len(content)))
+    
+    return ranges
+
 
 class Builder:
     """Сборка модулей в один файл"""
@@ -42,6 +172,10 @@ class Builder:
         self.metadata = None
         self.modules_order = []
         self.imports_collected = set()
+        # Кэш разобранных модулей: {rel_path: {mtime_ns, size, imports, code}}
+        self._parse_cache = self._load_parse_cache()
+        # mtime модулей, найденных при сканировании: {rel_path: mtime_ns}
+        self._module_mtimes: Dict[str, int] = {}
         
     def build(self, config: Optional[Dict[str, Any]] = None) -> bool:
         """
@@ -74,11 +208,11 @@ class Builder:
         print("[BUILD] Сборка кода из модулей...")
         code_parts = self._collect_code_parts()
         
-        # 4. Объединяем код
+        # 4. Объединяем код (части выдаются по мере записи, без общей строки)
         print("[BUILD] Объединение кода...")
         combined_code = self._combine_code(code_parts, config)
         
-        # 5. Применяем настройки (очистка, оптимизация)
+        # 5. Применяем настройки (очистка, оптимизация) потоково
         if config:
             print("[BUILD] Применение настроек...")
             combined_code = self._apply_config(combined_code, config)
@@ -89,6 +223,9 @@ class Builder:
             print("[ERROR] Ошибка сохранения результата")
             return False
         
+        # 7. Сохраняем кэш разобранных модулей для следующих сборок
+        self._save_parse_cache()
+        
         print(f"[SUCCESS] Сборка завершена успешно!")
         print(f"[INFO] Файл создан: {self.output_file}")
         return True
@@ -100,71 +237,153 @@ class Builder:
             if not os.path.exists(metadata_path):
                 return False
             
-            with open(metadata_path, 'r', encoding='utf-8') as f:
-                self.metadata = json.load(f)
+            self.metadata = _load_json(metadata_path)
             
             return True
         except Exception as e:
             print(f"[WARNING] Ошибка загрузки метаданных: {e}")
             return False
     
+    def _load_parse_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Загрузка кэша разобранных модулей из директории метаданных"""
+        cache_path = os.path.join(self.metadata_dir, PARSE_CACHE_FILE)
+        try:
+            cache = _load_json(cache_path)
+        except (OSError, ValueError):
+            return {}
+        
+        # Кэш другой версии формата считаем недействительным
+        if not isinstance(cache, dict) or cache.get('version') != PARSE_CACHE_VERSION:
+            return {}
+        return cache.get('entries', {})
+    
+    def _save_parse_cache(self) -> None:
+        """Сохранение кэша разобранных модулей (только для текущих модулей)"""
+        entries = {path: self._parse_cache[path] for path in self.modules_order
+                   if path in self._parse_cache}
+        try:
+            self._write_metadata_json(PARSE_CACHE_FILE, {'version': PARSE_CACHE_VERSION, 'entries': entries})
+        except OSError as e:
+            print(f"[WARNING] Не удалось сохранить кэш модулей: {e}")
+    
+    def _write_metadata_json(self, file_name: str, data: Any) -> None:
+        """
+        Атомарная запись JSON в директорию метаданных
+        
+        Файл пишется во временный и заменяется через os.replace, чтобы
+        прерванная сборка не оставила поврежденный кэш.
+        """
+        os.makedirs(self.metadata_dir, exist_ok=True)
+        path = os.path.join(self.metadata_dir, file_name)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    
+    def _order_signature(self) -> str:
+        """Сигнатура набора модулей: имена и mtime модулей и метаданных"""
+        metadata_path = os.path.join(self.metadata_dir, 'metadata.json')
+        try:
+            metadata_mtime = os.stat(metadata_path).st_mtime_ns
+        except OSError:
+            metadata_mtime = None
+        key = repr((ORDER_CACHE_VERSION, metadata_mtime, sorted(self._module_mtimes.items())))
+        # 128 бит достаточно для ключа кэша, короткий дайджест дешевле
+        return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def _load_order_cache(self, signature: str) -> Optional[List[str]]:
+        """Порядок модулей из кэша, если сигнатура совпадает"""
+        try:
+            cache = _load_json(os.path.join(self.metadata_dir, ORDER_CACHE_FILE))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(cache, dict) or cache.get('signature') != signature:
+            return None
+        return cache.get('order')
+    
+    def _save_order_cache(self, signature: str) -> None:
+        """Сохранение порядка модулей для следующих сборок"""
+        try:
+            self._write_metadata_json(ORDER_CACHE_FILE, {'signature': signature, 'order': self.modules_order})
+        except OSError as e:
+            print(f"[WARNING] Не удалось сохранить кэш порядка модулей: {e}")
+    
     def _determine_load_order(self) -> bool:
         """Определение порядка загрузки модулей"""
         try:
             # Собираем все модули
             all_modules = []
+            self._module_mtimes = {}
             
-            # Сканируем директорию модулей
-            for root, dirs, files in os.walk(self.modules_dir):
-                # Пропускаем метаданные и __pycache__
-                if DEFAULT_METADATA_DIR in root or '__pycache__' in root:
-                    continue
-                
-                for file in files:
-                    if file.endswith('.py') and file != '__init__.py':
-                        module_path = os.path.join(root, file)
-                        rel_path = os.path.relpath(module_path, self.modules_dir)
-                        all_modules.append(rel_path)
+            # Сканируем директорию модулей (os.scandir вместо os.walk:
+            # DirEntry берет тип файла из d_type без лишних вызовов stat)
+            stack = [self.modules_dir]
+            while stack:
+                current_dir = stack.pop()
+                with os.scandir(current_dir) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            # Пропускаем метаданные и __pycache__ еще до спуска в них
+                            if entry.name not in ('__pycache__', DEFAULT_METADATA_DIR):
+                                stack.append(entry.path)
+                        elif entry.is_file():
+                            if entry.name.endswith('.py') and entry.name != '__init__.py':
+                                rel_path = os.path.relpath(entry.path, self.modules_dir)
+                                all_modules.append(rel_path)
+                                # mtime нужен для сигнатуры кэша порядка модулей
+                                self._module_mtimes[rel_path] = entry.stat().st_mtime_ns
             
+            # Если набор модулей не менялся, берем порядок из кэша
+            signature = self._order_signature()
+            cached_order = self._load_order_cache(signature)
+            if cached_order is not None:
+                print("[BUILD] Порядок модулей взят из кэша")
+                self.modules_order = cached_order
             # Если есть метаданные, используем их для определения порядка
-            if self.metadata and 'structure' in self.metadata:
+            elif self.metadata and 'structure' in self.metadata:
                 # Используем граф зависимостей для определения порядка
-                from .dependency_resolver import DependencyResolver
                 resolver = DependencyResolver(self.metadata['structure'])
-                dependencies = resolver.resolve()
-                load_order = resolver.get_load_order()
+                resolver.resolve()
                 
                 # Создаем маппинг: имя класса -> путь модуля
+                all_modules_set = set(all_modules)
                 class_to_module = {}
                 if 'module_mapping' in self.metadata:
                     # Инвертируем module_mapping: имя класса -> путь модуля
                     for class_name, module_path in self.metadata['module_mapping'].items():
                         rel_path = os.path.relpath(module_path, self.modules_dir)
-                        class_to_module[class_name] = rel_path
+                        if rel_path in all_modules_set:
+                            class_to_module[class_name] = rel_path
+                
+                # Топологическая сортировка модулей по уровням (алгоритм Кана).
+                # Внутри уровня раньше идут модули с самой длинной цепочкой
+                # зависимых и с большим числом зависимых, затем - по категории и имени
+                # (dict как упорядоченное множество: проверка вхождения за O(1))
+                module_dependencies = resolver.get_module_dependencies(class_to_module)
+                levels = DependencyResolver.topological_levels(module_dependencies)
+                metrics = DependencyResolver.chain_metrics(module_dependencies, levels)
                 
-                # Определяем порядок модулей на основе порядка классов
-                ordered_modules = []
-                for class_name in load_order:
-                    if class_name in class_to_module:
-                        module_path = class_to_module[class_name]
-                        if module_path in all_modules and module_path not in ordered_modules:
-                            ordered_modules.append(module_path)
+                def level_key(module: str) -> Tuple[int, int, Tuple[int, str, str]]:
+                    chain_depth, num_dependents = metrics[module]
+                    return (-chain_depth, -num_dependents, self._module_sort_key(module))
+                
+                ordered_modules: Dict[str, None] = {}
+                for level in levels:
+                    for module in sorted(level, key=level_key):
+                        ordered_modules.setdefault(module, None)
                 
                 # Добавляем модули, которых нет в зависимостях
-                for module in all_modules:
-                    if module not in ordered_modules:
-                        ordered_modules.append(module)
+                for module in sorted(all_modules, key=self._module_sort_key):
+                    ordered_modules.setdefault(module, None)
                 
                 # Приоритетные файлы всегда первыми (только если они существуют)
                 priority_files = ['config.py', 'imports.py']
                 self.modules_order = []
                 for priority in priority_files:
-                    # Проверяем, существует ли файл в директории модулей
-                    priority_path = os.path.join(self.modules_dir, priority)
-                    if os.path.exists(priority_path) and priority in ordered_modules:
+                    # ordered_modules содержит только найденные при сканировании файлы
+                    if priority in ordered_modules:
                         self.modules_order.append(priority)
-                        if priority in ordered_modules:
-                            ordered_modules.remove(priority)
+                        del ordered_modules[priority]
                 
                 # Добавляем остальные модули в порядке зависимостей
                 self.modules_order.extend(ordered_modules)
@@ -172,31 +391,44 @@ class Builder:
                 # Автоматическое определение порядка (fallback)
                 # Сначала config.py, imports.py (если существуют), затем по категориям
                 priority_files = ['config.py', 'imports.py']
-                other_modules = [m for m in all_modules if m not in priority_files]
+                priority_set = set(priority_files)
+                
+                # Раскладываем модули по категориям за один проход
+                # (категория - первая часть пути, модули в корне - без категории)
+                category_buckets: Dict[str, List[str]] = {}
+                leftover = []
+                present_priority = set()
+                for module in all_modules:
+                    if module in priority_set:
+                        present_priority.add(module)
+                        continue
+                    parts = module.split(os.sep, 1)
+                    if len(parts) == 2:
+                        category_buckets.setdefault(parts[0], []).append(module)
+                    else:
+                        leftover.append(module)
                 
                 self.modules_order = []
-                for priority in priority_files:
-                    # Проверяем, существует ли файл в директории модулей
-                    priority_path = os.path.join(self.modules_dir, priority)
-                    if os.path.exists(priority_path) and priority in all_modules:
-                        self.modules_order.append(priority)
+                placed = set()
                 
-                # Определяем категории динамически из структуры модулей
-                categories = set()
-                for module in other_modules:
-                    parts = module.split(os.sep)
-                    if len(parts) >= 2:
-                        categories.add(parts[0])
+                def place(modules: List[str]) -> None:
+                    for module in modules:
+                        if module not in placed:
+                            placed.add(module)
+                            self.modules_order.append(module)
                 
-                # Сортируем категории и добавляем модули по категориям
-                category_order = sorted(categories)
-                for category in category_order:
-                    category_modules = [m for m in other_modules if m.startswith(category + os.sep)]
-                    self.modules_order.extend(sorted(category_modules))
+                # Приоритетные файлы в объявленном порядке (только если существуют)
+                place([priority for priority in priority_files if priority in present_priority])
+                
+                # Затем модули по категориям в алфавитном порядке
+                for category in sorted(category_buckets):
+                    place(sorted(category_buckets[category]))
                 
                 # Добавляем остальные модули (не в категориях)
-                remaining = [m for m in other_modules if m not in self.modules_order]
-                self.modules_order.extend(sorted(remaining))
+                place(sorted(leftover))
+            
+            if cached_order is None:
+                self._save_order_cache(signature)
             
             print(f"[BUILD] Найдено модулей: {len(self.modules_order)}")
             if len(self.modules_order) == 0:
@@ -211,6 +443,14 @@ class Builder:
             traceback.print_exc()
             return False
     
+    @staticmethod
+    def _module_sort_key(module: str) -> Tuple[int, str, str]:
+        """Ключ сортировки модуля: сначала модули категорий (по алфавиту), затем корневые"""
+        parts = module.split(os.sep, 1)
+        if len(parts) == 2:
+            return (0, parts[0], module)
+        return (1, '', module)
+    
     def _collect_code_parts(self) -> List[Dict[str, Any]]:
         """Сборка частей кода из модулей"""
         code_parts = []
@@ -222,89 +462,114 @@ class Builder:
         
         print(f"[BUILD] Сборка кода из {len(self.modules_order)} модулей...")
         
-        for module_path in self.modules_order:
-            full_path = os.path.join(self.modules_dir, module_path)
-            
-            if not os.path.exists(full_path):
-                print(f"[WARNING] Модуль не найден: {module_path}")
-                continue
-            
-            try:
-                with open(full_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Извлекаем импорты и код
-                imports, code = self._extract_imports_and_code(content)
-                
-                code_parts.append({
-                    'path': module_path,
+        # Читаем модули параллельно: чтение файлов отпускает GIL,
+        # а ex.map сохраняет порядок self.modules_order
+        max_workers = min(32, len(self.modules_order))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(self._read_module, self.modules_order))
+        
+        # Разбираем прочитанные (не найденные в кэше) модули
+        to_parse = [part for _, part, error in results if part is not None and 'content' in part]
+        if to_parse:
+            parsed = self._extract_all([part['content'] for part in to_parse])
+            for part, (imports, code) in zip(to_parse, parsed):
+                self._parse_cache[part['path']] = {
+                    'mtime_ns': part.pop('mtime_ns'),
+                    'size': part.pop('size'),
                     'imports': imports,
                     'code': code
-                })
-                
-                # Собираем импорты
-                self.imports_collected.update(imports)
-                
-            except Exception as e:
-                print(f"[WARNING] Ошибка чтения модуля {module_path}: {e}")
+                }
+                del part['content']
+                part['imports'] = imports
+                part['code'] = code
+        
+        for module_path, part, error in results:
+            if error:
+                print(f"[WARNING] {error}")
                 continue
+            
+            code_parts.append(part)
+            
+            # Собираем импорты (в основном потоке, без гонок на множестве)
+            self.imports_collected.update(part['imports'])
         
         return code_parts
     
-    def _extract_imports_and_code(self, content: str) -> tuple:
+    def _read_module(self, module_path: str) -> Tuple[str, Optional[Dict[str, Any]], Optional[str]]:
         """
-        Извлечение импортов и кода из модуля
+        Чтение одного модуля
+        
+        Неизмененный модуль возвращается из кэша уже разобранным (imports, code),
+        остальные - с содержимым (content) для последующего разбора.
+        
+        Args:
+            module_path: Относительный путь модуля
         
         Returns:
-            tuple: (imports_list, code_without_imports)
+            tuple: (module_path, part или None, сообщение об ошибке или None)
         """
-        lines = content.split('\n')
-        imports = []
-        code_lines = []
-        in_docstring = False
-        docstring_char = None
-        
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-            stripped = line.strip()
-            
-            # Пропускаем shebang и encoding
-            if i == 0 and (stripped.startswith('#!') or stripped.startswith('# -*-')):
-                i += 1
-                continue
-            
-            # Обработка docstrings
-            if '"""' in line or "'''" in line:
-                if not in_docstring:
-                    # Начало docstring
-                    in_docstring = True
-                    if '"""' in line:
-                        docstring_char = '"""'
-                    else:
-                        docstring_char = "'''"
-                else:
-                    # Конец docstring
-                    if docstring_char in line:
-                        in_docstring = False
-                        docstring_char = None
+        full_path = os.path.join(self.modules_dir, module_path)
+        
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            return module_path, None, f"Модуль не найден: {module_path}"
+        
+        try:
+            # Неизмененный модуль (тот же mtime и размер) берем из кэша
+            cached = self._parse_cache.get(module_path)
+            if cached and cached['mtime_ns'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+                return module_path, {
+                    'path': module_path,
+                    'imports': cached['imports'],
+                    'code': cached['code']
+                }, None
             
-            # Собираем импорты (только если не в docstring)
-            if not in_docstring:
-                if stripped.startswith('import ') or stripped.startswith('from '):
-                    imports.append(line)
-                    i += 1
-                    continue
+            with open(full_path, 'r', encoding='utf-8') as f:
+                content = f.read()
             
-            # Остальной код
-            code_lines.append(line)
-            i += 1
+            return module_path, {
+                'path': module_path,
+                'content': content,
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size
+            }, None
+        except Exception as e:
+            return module_path, None, f"Ошибка чтения модуля {module_path}: {e}"
+    
+    def _extract_all(self, contents: List[str]) -> List[Tuple[List[str], str]]:
+        """
+        Извлечение импортов и кода из нескольких модулей
+        
+        Разбор - чистая работа CPU на Python, поэтому для большого числа модулей
+        он выполняется в отдельных процессах (в обход GIL).
+        
+        Args:
+            contents: Содержимое модулей
         
-        code = '\n'.join(code_lines)
-        return imports, code
+        Returns:
+            List: Пары (imports, code) в том же порядке
+        """
+        if len(contents) > PROCESS_POOL_MIN_MODULES:
+            # Импорт тянет multiprocessing, поэтому только когда пул действительно нужен
+            from concurrent.futures import ProcessPoolExecutor
+            try:
+                with ProcessPoolExecutor() as executor:
+                    return list(executor.map(_extract_imports_and_code, contents,
+                                             chunksize=PROCESS_POOL_CHUNKSIZE))
+            except (OSError, RuntimeError) as e:
+                # Например, запуск процессов запрещен окружением
+                print(f"[WARNING] Параллельный разбор недоступен, разбираем последовательно: {e}")
+        
+        return [_extract_imports_and_code(content) for content in contents]
     
-    def _combine_code(self, code_parts: List[Dict[str, Any]], config: Optional[Dict[str, Any]] = None) -> str:
-        """Объединение кода из модулей"""
+    def _combine_code(self, code_parts: List[Dict[str, Any]], config: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """
+        Объединение кода из модулей
+        
+        Фрагменты выходного файла выдаются по очереди (заголовок, импорты,
+        секции модулей), чтобы не держать весь файл в памяти одной строкой.
+        """
         # Заголовок файла
         header = '''#!/usr/bin/env python
 # -*- coding: utf-8 -*-
@@ -318,68 +583,63 @@ class Builder:
         if not code_parts:
             print("[WARNING] Нет частей кода для объединения, возвращаем только заголовок")
             print("[WARNING] Проверьте, что в директории есть .py файлы (кроме __init__.py)")
-            return header
+            yield header
+            return
         
         print(f"[BUILD] Объединение {len(code_parts)} частей кода...")
         
-        # Собираем все уникальные импорты
-        all_imports = []
-        seen_imports = set()
-        
+        # Собираем все уникальные импорты: каждая строка нормализуется один раз,
+        # dict дает проверку дубликатов за O(1) и сохраняет порядок появления
+        unique_imports: Dict[str, None] = {}
         for part in code_parts:
             for imp in part['imports']:
-                # Нормализуем импорт для сравнения
                 normalized = imp.strip()
-                if normalized and normalized not in seen_imports:
-                    seen_imports.add(normalized)
-                    all_imports.append(imp)
+                if normalized and normalized not in unique_imports:
+                    unique_imports[normalized] = None
         
         # Группируем импорты
         standard_imports = []
         third_party_imports = []
-        local_imports = []
         
-        for imp in all_imports:
-            stripped = imp.strip()
-            if stripped.startswith('from .') or stripped.startswith('import .'):
+        for imp in unique_imports:
+            if imp.startswith(('from .', 'import .')):
                 # Локальные импорты - пропускаем (они будут заменены)
                 continue
-            elif any(module in stripped for module in ['os', 'sys', 'json', 're', 'typing', 'abc', 'collections', 'datetime', 'threading', 'queue', 'tempfile', 'shutil', 'subprocess', 'hashlib', 'time', 'traceback']):
+            name = _top_module(imp)
+            if name in STDLIB:
                 standard_imports.append(imp)
-            elif any(module in stripped for module in ['tkinter', 'requests', 'psutil']):
+            elif name in THIRD_PARTY:
                 third_party_imports.append(imp)
             else:
                 standard_imports.append(imp)
         
-        # Сортируем импорты
-        standard_imports = sorted(set(standard_imports))
-        third_party_imports = sorted(set(third_party_imports))
+        # Сортируем импорты (дубликаты уже отброшены)
+        standard_imports.sort()
+        third_party_imports.sort()
         
-        # Объединяем код
-        combined = header
+        yield header
         
         # Добавляем импорты
         if standard_imports:
-            combined += '\n'.join(standard_imports) + '\n\n'
+            yield '\n'.join(standard_imports) + '\n\n'
         
         if third_party_imports:
-            combined += '\n'.join(third_party_imports) + '\n\n'
+            yield '\n'.join(third_party_imports) + '\n\n'
         
         # Добавляем код из модулей
         code_sections = 0
         total_code_length = 0
         for part in code_parts:
             # Удаляем локальные импорты из кода
-            code = part['code']
-            code = re.sub(r'^from \. import .*$', '', code, flags=re.MULTILINE)
-            code = re.sub(r'^from \.\w+ import .*$', '', code, flags=re.MULTILINE)
+            code = _LOCAL_IMPORT_RE.sub('', part['code'])
             
             if code.strip():  # Проверяем, что код не пустой
                 # Добавляем разделитель
-                combined += f"\n# ============================================================================\n"
-                combined += f"# {part['path']}\n"
-                combined += f"# ============================================================================\n\n"
-                combined += code + '\n\n'
+                yield ("\n# ============================================================================\n"
+                       f"# {part['path']}\n"
+                       "# ============================================================================\n\n")
+                yield code
+                yield '\n\n'
                 code_sections += 1
                 total_code_length += len(code)
             else:
@@ -389,40 +649,62 @@ class Builder:
             print("[WARNING] Код из модулей не найден, файл будет содержать только заголовок и импорты")
         else:
             print(f"[BUILD] Добавлено {code_sections} секций кода, всего {total_code_length} символов")
-        
-        print(f"[BUILD] Итоговый размер файла: {len(combined)} символов")
-        return combined
     
-    def _apply_config(self, code: str, config: Dict[str, Any]) -> str:
-        """Применение настроек сборки"""
-        # Очистка
-        if config.get('cleanup', {}).get('remove_empty_lines', False):
-            lines = code.split('\n')
-            max_empty = config['cleanup'].get('max_empty_lines', 2)
-            
-            cleaned_lines = []
-            empty_count = 0
-            
-            for line in lines:
+    def _apply_config(self, chunks: Iterable[str], config: Dict[str, Any]) -> Iterator[str]:
+        """
+        Применение настроек сборки
+        
+        Очистка выполняется построчно по мере поступления фрагментов;
+        незавершенная строка переносится в следующий фрагмент.
+        """
+        cleanup = config.get('cleanup', {})
+        remove_empty = cleanup.get('remove_empty_lines', False)
+        remove_trailing = cleanup.get('remove_trailing_whitespace', False)
+        
+        if not remove_empty and not remove_trailing:
+            yield from chunks
+            return
+        
+        max_empty = cleanup.get('max_empty_lines', 2)
+        empty_count = 0
+        pending = ''
+        
+        def clean(line: str) -> Optional[str]:
+            nonlocal empty_count
+            # Удаление trailing whitespace
+            if remove_trailing:
+                line = line.rstrip()
+            # Ограничение числа пустых строк подряд
+            if remove_empty:
                 if not line.strip():
                     empty_count += 1
-                    if empty_count <= max_empty:
-                        cleaned_lines.append(line)
+                    if empty_count > max_empty:
+                        return None
                 else:
                     empty_count = 0
-                    cleaned_lines.append(line)
-            
-            code = '\n'.join(cleaned_lines)
-        
-        # Удаление trailing whitespace
-        if config.get('cleanup', {}).get('remove_trailing_whitespace', False):
-            lines = code.split('\n')
-            code = '\n'.join(line.rstrip() for line in lines)
-        
-        return code
+            return line
+        
+        # Разделитель ставится перед каждой строкой, кроме первой,
+        # чтобы результат совпадал с '\n'.join(...) по всем строкам
+        separator = ''
+        for chunk in chunks:
+            # Незавершенную строку приклеиваем только к первой строке фрагмента,
+            # а не ко всему фрагменту (без лишней копии кода модуля)
+            lines = chunk.split('\n')
+            lines[0] = pending + lines[0]
+            pending = lines.pop()
+            cleaned_lines = [line for line in map(clean, lines) if line is not None]
+            if cleaned_lines:
+                yield separator + '\n'.join(cleaned_lines)
+                separator = '\n'
+        
+        # Последняя строка (после последнего перевода строки)
+        last = clean(pending)
+        if last is not None:
+            yield separator + last
     
-    def _save_output(self, code: str) -> bool:
-        """Сохранение результата"""
+    def _save_output(self, code: Iterable[str]) -> bool:
+        """Сохранение результата (фрагменты кода пишутся в файл по мере поступления)"""
         try:
             # Проверяем абсолютный путь
             output_file_abs = os.path.abspath(self.output_file)
@@ -430,7 +712,6 @@ class Builder:
             
             print(f"[BUILD] Сохранение файла: {output_file_abs}")
             print(f"[BUILD] Директория выходного файла: {output_dir}")
-            print(f"[BUILD] Размер кода: {len(code)} символов")
             
             # Проверяем, что директория существует
             if output_dir and not os.path.exists(output_dir):
@@ -448,39 +729,34 @@ class Builder:
             
             # Сохраняем файл
             print(f"[BUILD] Запись файла...")
-            with open(output_file_abs, 'w', encoding='utf-8') as f:
-                f.write(code)
-            
-            # Синхронизируем файловую систему
-            time.sleep(0.1)  # Небольшая задержка для синхронизации
+            # Каждый фрагмент кодируется в UTF-8 один раз и пишется в бинарном
+            # режиме: без текстовой обертки и преобразования переводов строк.
+            # Код генерируется по ходу записи, поэтому пишем во временный файл
+            # и заменяем им результат только после успешной записи: ошибка
+            # генерации не оставит вместо прошлой сборки обрезанный файл
+            file_size = 0
+            tmp_path = output_file_abs + '.tmp'
+            try:
+                with open(tmp_path, 'wb', buffering=OUTPUT_BUFFER_SIZE) as f:
+                    for chunk in code:
+                        data = chunk.encode('utf-8')
+                        f.write(data)
+                        file_size += len(data)
+                    # Сбрасываем данные на диск до замены файла
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, output_file_abs)
+            except Exception:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
             
             # Проверяем, что файл создан
             if os.path.exists(output_file_abs):
-                file_size = os.path.getsize(output_file_abs)
                 print(f"[BUILD] Файл успешно сохранен: {output_file_abs}")
                 print(f"[BUILD] Размер файла: {file_size} байт")
-                print(f"[BUILD] Файл существует: {os.path.exists(output_file_abs)}")
-                print(f"[BUILD] Полный путь: {os.path.abspath(output_file_abs)}")
-                
-                # Дополнительная проверка - читаем файл обратно
-                try:
-                    with open(output_file_abs, 'r', encoding='utf-8') as f:
-                        read_size = len(f.read())
-                    print(f"[BUILD] Размер прочитанного файла: {read_size} символов")
-                    if read_size != len(code):
-                        print(f"[WARNING] Размеры не совпадают: записано {len(code)}, прочитано {read_size}")
-                except Exception as e:
-                    print(f"[WARNING] Не удалось прочитать файл для проверки: {e}")
-                
-                # Проверяем содержимое директории
-                if os.path.exists(output_dir):
-                    files_in_dir = os.listdir(output_dir)
-                    print(f"[BUILD] Файлы в директории: {files_in_dir}")
-                    if os.path.basename(output_file_abs) not in files_in_dir:
-                        print(f"[ERROR] Файл не найден в списке файлов директории!")
-                        print(f"[ERROR] Ищем: {os.path.basename(output_file_abs)}")
-                        print(f"[ERROR] В директории: {files_in_dir}")
-                
                 self.output_file = output_file_abs  # Обновляем путь на абсолютный
                 return True
             else:
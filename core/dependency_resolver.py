@@ -8,7 +8,8 @@ FSA-ProjectBuilder - Разрешение зависимостей
 """
 
 from __future__ import print_function
-from typing import Dict, List, Set, Optional, Tuple, Any
+import sys
+from typing import Dict, FrozenSet, List, Set, Optional, Tuple, Any
 
 
 class DependencyResolver:
@@ -22,16 +23,19 @@ class DependencyResolver:
             structure: Структура файла от парсера
         """
         self.structure = structure
-        self.dependencies = {}  # {component_name: [dependencies]}
+        self.dependencies = {}  # {component_name: frozenset(dependencies)}
         self.dependents = {}    # {component_name: [dependents]}
+        self._component_names = frozenset()  # Имена всех компонентов структуры
+        self._all_nodes = None  # Все узлы графа (компоненты и их зависимости)
         
-    def resolve(self) -> Dict[str, List[str]]:
+    def resolve(self) -> Dict[str, FrozenSet[str]]:
         """
         Разрешение всех зависимостей
         
         Returns:
-            Dict: Словарь зависимостей {component: [dependencies]}
+            Dict: Словарь зависимостей {component: frozenset(dependencies)}
         """
+        self._component_names = self._collect_component_names()
         self._analyze_classes()
         self._analyze_functions()
         self._build_dependency_graph()
@@ -45,137 +49,180 @@ class DependencyResolver:
         Returns:
             List: Порядок загрузки компонентов
         """
-        # Собираем все компоненты
-        all_components = set()
-        for deps in self.dependencies.values():
-            all_components.update(deps)
-        all_components.update(self.dependencies.keys())
-        
-        # Топологическая сортировка
-        visited = set()
-        temp_visited = set()
-        result = []
-        
-        def visit(component: str):
-            if component in temp_visited:
-                # Циклическая зависимость
-                return
-            if component in visited:
-                return
-            
-            temp_visited.add(component)
-            
-            # Посещаем зависимости
-            for dep in self.dependencies.get(component, []):
-                if dep in all_components:
-                    visit(dep)
-            
-            temp_visited.remove(component)
-            visited.add(component)
-            result.append(component)
+        # Все компоненты собраны при построении графа в resolve();
+        # для заданного напрямую self.dependencies собираем их здесь
+        all_components = self._all_nodes
+        if all_components is None:
+            all_components = self._collect_graph_nodes()
         
-        for component in all_components:
-            if component not in visited:
-                visit(component)
+        # Топологическая сортировка алгоритмом Кана (подсчет входящих степеней,
+        # без рекурсии). Компоненты из циклов и зависящие от них идут в конце
+        dependencies = self.dependencies
+        graph = {component: dependencies.get(component, ()) for component in sorted(all_components)}
+        result = [component for level in self.topological_levels(graph) for component in level]
         
         return result
     
+    def get_module_dependencies(self, component_to_module: Dict[str, str]) -> Dict[str, Set[str]]:
+        """
+        Перенос зависимостей компонентов на уровень модулей
+        
+        Args:
+            component_to_module: Маппинг {имя компонента: путь модуля}
+        
+        Returns:
+            Dict: Зависимости модулей {module: {модули, от которых он зависит}}
+        """
+        module_dependencies = {module: set() for module in component_to_module.values()}
+        for component, deps in self.dependencies.items():
+            module = component_to_module.get(component)
+            if module is None:
+                continue
+            for dep in deps:
+                dep_module = component_to_module.get(dep)
+                if dep_module is not None and dep_module != module:
+                    module_dependencies[module].add(dep_module)
+        
+        return module_dependencies
+    
+    @staticmethod
+    def topological_levels(dependencies: Dict[str, Set[str]]) -> List[List[str]]:
+        """
+        Разбиение графа на уровни алгоритмом Кана
+        
+        Каждый уровень содержит узлы, все зависимости которых находятся
+        на предыдущих уровнях. Узлы, оставшиеся в циклах, идут последним уровнем.
+        
+        Args:
+            dependencies: Граф зависимостей {node: {зависимости}}
+        
+        Returns:
+            List: Список уровней (каждый уровень - список узлов)
+        """
+        # Узлы, встречающиеся только как зависимости, тоже входят в граф
+        in_degree = {}
+        dependents = {}
+        for node, deps in dependencies.items():
+            in_degree.setdefault(node, 0)
+            dependents.setdefault(node, [])
+            for dep in deps:
+                in_degree.setdefault(dep, 0)
+                dependents.setdefault(dep, []).append(node)
+                in_degree[node] += 1
+        
+        levels = []
+        level = [node for node, degree in in_degree.items() if degree == 0]
+        while level:
+            levels.append(level)
+            next_level = []
+            for node in level:
+                for dependent in dependents[node]:
+                    in_degree[dependent] -= 1
+                    if in_degree[dependent] == 0:
+                        next_level.append(dependent)
+            level = next_level
+        
+        # Циклические зависимости - оставшиеся узлы одним уровнем
+        remaining = [node for node, degree in in_degree.items() if degree > 0]
+        if remaining:
+            levels.append(remaining)
+        
+        return levels
+    
+    @staticmethod
+    def chain_metrics(dependencies: Dict[str, Set[str]], levels: Optional[List[List[str]]] = None) -> Dict[str, Tuple[int, int]]:
+        """
+        Длина цепочки зависимых узлов и число прямых зависимых для каждого узла
+        
+        Узлы с длинной цепочкой зависимых выгодно ставить раньше внутри уровня:
+        за ними ждет больше работы.
+        
+        Args:
+            dependencies: Граф зависимостей {node: {зависимости}}
+            levels: Уровни из topological_levels (вычисляются, если не переданы)
+        
+        Returns:
+            Dict: {node: (длина цепочки зависимых, число прямых зависимых)}
+        """
+        if levels is None:
+            levels = DependencyResolver.topological_levels(dependencies)
+        
+        dependents = {}
+        for node, deps in dependencies.items():
+            for dep in deps:
+                dependents.setdefault(dep, []).append(node)
+        
+        # Обратный проход по уровням: зависимые узлы всегда на более поздних уровнях
+        # (для узлов из циклов глубина приблизительная)
+        depth = {}
+        for level in reversed(levels):
+            for node in level:
+                depth[node] = 1 + max((depth.get(dependent, 0) for dependent in dependents.get(node, [])), default=0)
+        
+        return {node: (node_depth, len(dependents.get(node, []))) for node, node_depth in depth.items()}
+    
+    def _collect_component_names(self) -> FrozenSet[str]:
+        """
+        Сбор имен всех компонентов (классов, функций, констант) структуры
+        
+        Имена интернируются: структура из metadata.json содержит отдельные
+        копии строк, а интернированные строки сравниваются по указателю
+        при всех проверках принадлежности в графе.
+        """
+        names = set()
+        for group in ('classes', 'functions', 'constants'):
+            for component in self.structure.get(group, []):
+                component['name'] = sys.intern(component['name'])
+                names.add(component['name'])
+        return frozenset(names)
+    
     def _analyze_classes(self):
         """Анализ зависимостей классов"""
-        # Собираем все имена компонентов для проверки
-        all_component_names = set()
-        for cls in self.structure.get('classes', []):
-            all_component_names.add(cls['name'])
-        for func in self.structure.get('functions', []):
-            all_component_names.add(func['name'])
-        for const in self.structure.get('constants', []):
-            all_component_names.add(const['name'])
+        all_component_names = self._component_names
         
         # Получаем анализ использований из парсера
         usages = self.structure.get('usages', {})
         
         for cls in self.structure.get('classes', []):
             cls_name = cls['name']
-            dependencies = set()
-            
-            # Зависимости от базовых классов
-            for base in cls.get('bases', []):
-                # Проверяем, что базовый класс есть в проекте
-                if base in all_component_names:
-                    dependencies.add(base)
             
-            # Зависимости из анализа использований
-            if cls_name in usages:
-                for used in usages[cls_name]:
-                    if used in all_component_names:
-                        dependencies.add(used)
-            
-            # Анализируем код класса для поиска использований
-            cls_code = cls.get('code', '')
-            if cls_code:
-                # Ищем использования других компонентов в коде класса
-                import re
-                for component_name in all_component_names:
-                    if component_name == cls_name:
-                        continue
-                    # Ищем использование компонента в коде (не в комментариях)
-                    pattern = r'\b' + re.escape(component_name) + r'\b'
-                    if re.search(pattern, cls_code):
-                        # Проверяем, что это не просто часть другого имени
-                        # (например, ComponentHandler не должен совпадать с Handler)
-                        if component_name not in dependencies:
-                            dependencies.add(component_name)
-            
-            self.dependencies[cls_name] = list(dependencies)
+            # Зависимости из анализа использований (AST парсера) и от базовых
+            # классов проекта - одно пересечение множеств на класс
+            used = set(usages.get(cls_name, ()))
+            used.update(cls.get('bases', ()))
+            self.dependencies[cls_name] = all_component_names.intersection(used) - {cls_name}
     
     def _analyze_functions(self):
         """Анализ зависимостей функций"""
-        # Собираем все имена компонентов для проверки
-        all_component_names = set()
-        for cls in self.structure.get('classes', []):
-            all_component_names.add(cls['name'])
-        for func in self.structure.get('functions', []):
-            all_component_names.add(func['name'])
-        for const in self.structure.get('constants', []):
-            all_component_names.add(const['name'])
+        all_component_names = self._component_names
         
         # Получаем анализ использований из парсера
         usages = self.structure.get('usages', {})
         
         for func in self.structure.get('functions', []):
             func_name = func['name']
-            dependencies = set()
-            
-            # Зависимости из анализа использований
-            if func_name in usages:
-                for used in usages[func_name]:
-                    if used in all_component_names:
-                        dependencies.add(used)
-            
-            # Анализируем код функции для поиска использований
-            func_code = func.get('code', '')
-            if func_code:
-                # Ищем использования других компонентов в коде функции
-                import re
-                for component_name in all_component_names:
-                    if component_name == func_name:
-                        continue
-                    # Ищем использование компонента в коде (не в комментариях)
-                    pattern = r'\b' + re.escape(component_name) + r'\b'
-                    if re.search(pattern, func_code):
-                        if component_name not in dependencies:
-                            dependencies.add(component_name)
             
-            self.dependencies[func_name] = list(dependencies)
+            # Зависимости из анализа использований (AST парсера)
+            self.dependencies[func_name] = all_component_names.intersection(usages.get(func_name, ())) - {func_name}
     
     def _build_dependency_graph(self):
         """Построение графа зависимостей"""
-        # Строим обратный граф (dependents)
+        # Строим обратный граф (dependents) и в том же проходе собираем все узлы
+        all_nodes = set(self.dependencies)
         for component, deps in self.dependencies.items():
+            all_nodes.update(deps)
             for dep in deps:
                 if dep not in self.dependents:
                     self.dependents[dep] = []
                 self.dependents[dep].append(component)
+        self._all_nodes = all_nodes
+    
+    def _collect_graph_nodes(self) -> Set[str]:
+        """Все узлы графа: компоненты и их зависимости"""
+        all_nodes = set(self.dependencies)
+        for deps in self.dependencies.values():
+            all_nodes.update(deps)
+        return all_nodes
     
     def detect_cycles(self) -> List[List[str]]:
         """
@@ -186,33 +233,36 @@ class DependencyResolver:
         """
         cycles = []
         visited = set()
-        rec_stack = set()
         path = []
+        # Позиция компонента в текущем пути: O(1) проверка "в стеке рекурсии"
+        # и начало цикла без линейного path.index()
+        path_pos = {}
         
-        def dfs(component: str):
-            if component in rec_stack:
-                # Найден цикл
-                cycle_start = path.index(component)
-                cycle = path[cycle_start:] + [component]
-                cycles.append(cycle)
-                return
-            
-            if component in visited:
-                return
-            
-            visited.add(component)
-            rec_stack.add(component)
-            path.append(component)
+        # Обход в глубину с явным стеком (component, итератор зависимостей)
+        for root in self.dependencies.keys():
+            if root in visited:
+                continue
             
-            for dep in self.dependencies.get(component, []):
-                dfs(dep)
-            
-            rec_stack.remove(component)
-            path.pop()
-        
-        for component in self.dependencies.keys():
-            if component not in visited:
-                dfs(component)
+            visited.add(root)
+            path_pos[root] = len(path)
+            path.append(root)
+            stack = [(root, iter(self.dependencies.get(root, [])))]
+            while stack:
+                component, deps = stack[-1]
+                for dep in deps:
+                    if dep in path_pos:
+                        # Найден цикл
+                        cycles.append(path[path_pos[dep]:] + [dep])
+                        continue
+                    if dep not in visited:
+                        visited.add(dep)
+                        path_pos[dep] = len(path)
+                        path.append(dep)
+                        stack.append((dep, iter(self.dependencies.get(dep, []))))
+                        break
+                else:
+                    stack.pop()
+                    del path_pos[path.pop()]
         
         return cycles
 
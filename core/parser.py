@@ -9,8 +9,69 @@ FSA-ProjectBuilder - Парсер Python кода
 
 from __future__ import print_function
 import ast
+import hashlib
+import json
+import logging
 import os
-from typing import Dict, List, Optional, Tuple, Any
+import re
+import sys
+from array import array
+from collections import deque
+from functools import partial
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Union, Any
+
+# Быстрый парсер JSON для кэша структур (опционально), при отсутствии - стандартный json
+try:
+    import orjson as _json_fast
+except ImportError:
+    _json_fast = None
+
+# Логгер парсера: дочерний к логгеру приложения, поэтому GUI пишет сообщения
+# в свой лог-файл; без настроенных обработчиков ошибки уходят в stderr
+logger = logging.getLogger('FSA-ProjectBuilder.parser')
+
+# Переводы строк (для таблицы смещений строк)
+_NEWLINE_RE = re.compile(r'\n')
+
+# Узлы, которые могут содержать инструкции (импорты бывают только инструкциями,
+# поэтому в выражения при поиске импортов спускаться не нужно)
+_STATEMENT_CONTAINERS = tuple(getattr(ast, name) for name in ('stmt', 'excepthandler', 'match_case') if hasattr(ast, name))
+
+# Минимальное число файлов для разбора в пуле процессов (меньше - запуск пула дороже разбора)
+PROCESS_POOL_MIN_FILES = 8
+
+# Максимальный размер пачки файлов на одну передачу в процесс (снижает накладные расходы IPC)
+PROCESS_POOL_CHUNKSIZE = 8
+
+# Версия формата кэша структур (смена версии инвалидирует старые записи)
+STRUCTURE_CACHE_VERSION = 1
+
+
+def _collect_load_names(node: ast.AST) -> Set[str]:
+    """
+    Сбор имен, читаемых внутри узла (ast.Name в контексте Load)
+    
+    Обход явным стеком по ast.iter_child_nodes: диспетчеризация NodeVisitor
+    (поиск метода visit_<Класс> на каждый узел) заметно дороже, а в узлы
+    Name спускаться не нужно - их единственный потомок это ctx.
+    """
+    names = set()
+    add = names.add
+    name_type = ast.Name
+    load_type = ast.Load
+    iter_child_nodes = ast.iter_child_nodes
+    stack = [node]
+    pop = stack.pop
+    extend = stack.extend
+    while stack:
+        current = pop()
+        if type(current) is name_type:
+            # Присваивания (ctx=Store) и удаления не являются использованием
+            if type(current.ctx) is load_type:
+                add(current.id)
+        else:
+            extend(iter_child_nodes(current))
+    return names
 
 
 class CodeParser:
@@ -26,7 +87,14 @@ class CodeParser:
         self.file_path = file_path
         self.ast_tree = None
         self.source_code = None
-        self.lines = []
+        # Смещения начала каждой строки в source_code (код компонентов
+        # вырезается одним срезом исходника, без списка строк и join).
+        # Компактный array('q') вместо списка объектов int
+        self.line_offsets = array('q')
+        # Результат единственного полного обхода AST: импорты
+        self._tree_index = None
+        # Узлы компонентов верхнего уровня по типам (один проход по tree.body)
+        self._body_index = None
         
     def parse(self) -> bool:
         """
@@ -39,17 +107,20 @@ class CodeParser:
             # Читаем файл
             with open(self.file_path, 'r', encoding='utf-8') as f:
                 self.source_code = f.read()
-                self.lines = self.source_code.split('\n')
+            self.line_offsets = array('q', [0])
+            self.line_offsets.extend(match.end() for match in _NEWLINE_RE.finditer(self.source_code))
             
             # Парсим в AST
             self.ast_tree = ast.parse(self.source_code, filename=self.file_path)
+            self._tree_index = None
+            self._body_index = None
             return True
             
         except SyntaxError as e:
-            print(f"[ERROR] Синтаксическая ошибка в файле {self.file_path}: {e}")
+            logger.error("Синтаксическая ошибка в файле %s: %s", self.file_path, e)
             return False
         except Exception as e:
-            print(f"[ERROR] Ошибка парсинга файла {self.file_path}: {e}")
+            logger.error("Ошибка парсинга файла %s: %s", self.file_path, e)
             return False
     
     def get_imports(self) -> List[Dict[str, Any]]:
@@ -59,38 +130,20 @@ class CodeParser:
         Returns:
             List[Dict]: Список импортов с информацией
         """
-        imports = []
-        
         if not self.ast_tree:
-            return imports
-        
-        for node in ast.walk(self.ast_tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    imports.append({
-                        'type': 'import',
-                        'module': alias.name,
-                        'alias': alias.asname,
-                        'line': node.lineno
-                    })
-            elif isinstance(node, ast.ImportFrom):
-                module = node.module or ''
-                for alias in node.names:
-                    imports.append({
-                        'type': 'from_import',
-                        'module': module,
-                        'name': alias.name,
-                        'alias': alias.asname,
-                        'line': node.lineno
-                    })
+            return []
         
-        return imports
+        return list(self._index_tree())
     
-    def get_classes(self) -> List[Dict[str, Any]]:
+    def get_classes(self, include_source: bool = True) -> List[Dict[str, Any]]:
         """
         Извлечение классов верхнего уровня
         ВАЖНО: Используем tree.body, а не ast.walk()!
         AST гарантирует точные границы через lineno и end_lineno
+        
+        Args:
+            include_source: Добавлять код класса ('code'); без него
+                исходник не копируется
         """
         classes = []
         
@@ -99,48 +152,50 @@ class CodeParser:
         
         # Ищем классы ТОЛЬКО верхнего уровня в tree.body
         # AST гарантирует, что tree.body содержит только верхний уровень
-        for node in self.ast_tree.body:
-            if isinstance(node, ast.ClassDef):
-                # AST знает точные границы!
-                start_line = node.lineno
-                end_line = getattr(node, 'end_lineno', start_line)
-                
-                # Получаем базовые классы
-                bases = []
-                for base in node.bases:
-                    if isinstance(base, ast.Name):
-                        bases.append(base.id)
-                    elif isinstance(base, ast.Attribute):
-                        bases.append(self._get_attr_name(base))
-                
-                # Получаем docstring
-                docstring = ast.get_docstring(node)
-                
-                # Получаем методы класса
-                methods = self._get_class_methods(node)
-                
+        for node in self._index_body()[ast.ClassDef]:
+            # AST знает точные границы!
+            start_line = node.lineno
+            end_line = node.end_lineno
+            
+            # Получаем базовые классы
+            bases = []
+            for base in node.bases:
+                base_type = type(base)
+                if base_type is ast.Name:
+                    bases.append(base.id)
+                elif base_type is ast.Attribute:
+                    bases.append(self._get_attr_name(base))
+            
+            # Получаем docstring
+            docstring = ast.get_docstring(node)
+            
+            # Получаем методы класса
+            methods = self._get_class_methods(node)
+            
+            class_info = {
+                'name': node.name,
+                'bases': bases,
+                'docstring': docstring,
+                'methods': methods,
+                'start_line': start_line,
+                'end_line': end_line
+            }
+            if include_source:
                 # Извлекаем код ТОЧНО по границам AST
                 # end_line уже 1-based, start_line тоже 1-based
-                # Для среза нужен 0-based, поэтому start_line - 1
-                code = '\n'.join(self.lines[start_line - 1:end_line]) if self.lines else ''
-                
-                classes.append({
-                    'name': node.name,
-                    'bases': bases,
-                    'docstring': docstring,
-                    'methods': methods,
-                    'start_line': start_line,
-                    'end_line': end_line,
-                    'code': code,
-                    'decorators': [self._get_decorator_name(d) for d in node.decorator_list]
-                })
+                class_info['code'] = self._get_source_lines(start_line, end_line)
+            class_info['decorators'] = [self._get_decorator_name(d) for d in node.decorator_list]
+            classes.append(class_info)
         
         return classes
     
-    def get_functions(self) -> List[Dict[str, Any]]:
+    def get_functions(self, include_source: bool = True) -> List[Dict[str, Any]]:
         """
         Извлечение всех функций из файла (не методов классов)
         
+        Args:
+            include_source: Добавлять код функции ('code')
+        
         Returns:
             List[Dict]: Список функций с информацией
         """
@@ -149,57 +204,42 @@ class CodeParser:
         if not self.ast_tree:
             return functions
         
-        # Собираем все методы классов для исключения
-        class_methods = set()
-        for node in ast.walk(self.ast_tree):
-            if isinstance(node, ast.ClassDef):
-                for item in node.body:
-                    if isinstance(item, ast.FunctionDef):
-                        class_methods.add(item.name)
-        
-        # Ищем функции верхнего уровня (только в корне модуля, не внутри классов)
-        for node in self.ast_tree.body:
-            if isinstance(node, ast.FunctionDef) and node.name not in class_methods:
-                docstring = ast.get_docstring(node)
-                
-                # Получаем аргументы
-                args = [arg.arg for arg in node.args.args]
-                
-                start_line = node.lineno
-                # Используем end_lineno если доступен, иначе вычисляем по AST
-                if hasattr(node, 'end_lineno') and node.end_lineno:
-                    end_line = node.end_lineno
-                else:
-                    # Если end_lineno недоступен, используем последнюю строку тела функции
-                    end_line = start_line
-                    if node.body:
-                        last_node = node.body[-1]
-                        if hasattr(last_node, 'end_lineno') and last_node.end_lineno:
-                            end_line = last_node.end_lineno
-                        elif hasattr(last_node, 'lineno'):
-                            end_line = last_node.lineno
-                
+        # Ищем функции верхнего уровня только в tree.body: методы классов
+        # и вложенные функции туда не попадают, обход всего AST не нужен
+        for node in self._index_body()[ast.FunctionDef]:
+            docstring = ast.get_docstring(node)
+            
+            # Получаем аргументы
+            args = [arg.arg for arg in node.args.args]
+            
+            start_line = node.lineno
+            # ast.parse (Python 3.8+) всегда заполняет end_lineno
+            end_line = node.end_lineno
+            
+            function_info = {
+                'name': node.name,
+                'args': args,
+                'docstring': docstring,
+                'start_line': start_line,
+                'end_line': end_line
+            }
+            if include_source:
                 # Извлекаем код функции (end_line уже 1-based, поэтому используем end_line без +1)
-                code = '\n'.join(self.lines[start_line - 1:end_line]) if self.lines else ''
-                
-                functions.append({
-                    'name': node.name,
-                    'args': args,
-                    'docstring': docstring,
-                    'start_line': start_line,
-                    'end_line': end_line,
-                    'code': code,
-                    'decorators': [self._get_decorator_name(d) for d in node.decorator_list]
-                })
+                function_info['code'] = self._get_source_lines(start_line, end_line)
+            function_info['decorators'] = [self._get_decorator_name(d) for d in node.decorator_list]
+            functions.append(function_info)
         
         return functions
     
-    def get_constants(self) -> List[Dict[str, Any]]:
+    def get_constants(self, include_source: bool = True) -> List[Dict[str, Any]]:
         """
         Извлечение констант (переменных верхнего уровня)
         ВАЖНО: Используем AST напрямую - он знает точные границы!
         AST гарантирует, что tree.body содержит только верхний уровень
         
+        Args:
+            include_source: Добавлять код присваивания ('code')
+        
         Returns:
             List[Dict]: Список констант с информацией
         """
@@ -209,57 +249,60 @@ class CodeParser:
             return constants
         
         # Ищем переменные верхнего уровня ТОЛЬКО в tree.body
-        # AST гарантирует, что tree.body содержит только верхний уровень
-        for node in self.ast_tree.body:
-            if isinstance(node, ast.Assign):
-                for target in node.targets:
-                    if isinstance(target, ast.Name):
-                        # AST знает точные границы!
-                        start_line = node.lineno
-                        end_line = getattr(node, 'end_lineno', start_line)
-                        
-                        # Извлекаем код ТОЧНО по границам AST
-                        if self.lines and start_line <= len(self.lines):
-                            # end_line уже 1-based, start_line тоже 1-based
-                            # Для среза нужен 0-based, поэтому start_line - 1
-                            # end_line уже 1-based, но для среза нужно включить, поэтому просто end_line
-                            assignment_code = '\n'.join(self.lines[start_line - 1:end_line])
-                            
-                            # ВАЖНО: Проверяем, что константа верхнего уровня
-                            # Если константа верхнего уровня, она НЕ должна иметь отступов
-                            # Проверяем первую строку кода (не пустую и не комментарий)
-                            code_lines = assignment_code.split('\n')
-                            first_code_line = None
-                            for line in code_lines:
-                                stripped = line.strip()
-                                if stripped and not stripped.startswith('#'):
-                                    first_code_line = line
-                                    break
-                            
-                            # Если первая строка кода имеет отступ - это не верхний уровень
-                            if first_code_line and first_code_line[0] in [' ', '\t']:
-                                # Это не верхний уровень - пропускаем
-                                continue
-                        else:
-                            # Если не удалось получить код, пропускаем
-                            continue
-                        
-                        constants.append({
-                            'name': target.id,
-                            'line': start_line,
-                            'end_line': end_line,  # Сохраняем end_line для проверки покрытия!
-                            'code': assignment_code
-                        })
+        # AST гарантирует, что tree.body содержит только верхний уровень,
+        # поэтому отдельная проверка отступов в коде не нужна
+        line_count = len(self.line_offsets)
+        for node in self._index_body()[ast.Assign]:
+            names = [target.id for target in node.targets if isinstance(target, ast.Name)]
+            if not names:
+                continue
+            
+            # AST знает точные границы! Код присваивания извлекаем один раз
+            # на узел, а не на каждую цель (a = b = 1)
+            start_line = node.lineno
+            end_line = node.end_lineno
+            
+            # Извлекаем код ТОЧНО по границам AST
+            if start_line > line_count:
+                # Если не удалось получить код, пропускаем
+                continue
+            assignment_code = self._get_source_lines(start_line, end_line) if include_source else None
+            
+            for name in names:
+                constant_info = {
+                    'name': name,
+                    'line': start_line,
+                    'end_line': end_line  # Сохраняем end_line для проверки покрытия!
+                }
+                if include_source:
+                    constant_info['code'] = assignment_code
+                constants.append(constant_info)
         
         return constants
     
-    def get_usages(self, component_name: str, code: str) -> List[str]:
+    def get_code(self, start_line: int, end_line: int) -> str:
+        """
+        Код строк исходника по границам компонента (срез по требованию)
+        
+        Args:
+            start_line: Первая строка (1-based)
+            end_line: Последняя строка (1-based, включительно)
+            
+        Returns:
+            str: Код строк start_line..end_line ('' после release)
+        """
+        if self.source_code is None:
+            return ''
+        return self._get_source_lines(start_line, end_line)
+    
+    def get_usages(self, component_name: str, code: Union[str, ast.AST]) -> List[str]:
         """
         Анализ использований компонента (класса/функции/константы) в коде
         
         Args:
             component_name: Имя компонента для поиска
-            code: Код для анализа
+            code: Код для анализа или уже разобранный узел AST
+                (узел используется как есть, без повторного парсинга)
             
         Returns:
             List[str]: Список использованных компонентов
@@ -267,79 +310,209 @@ class CodeParser:
         if not code:
             return []
         
-        try:
-            # Парсим код в AST
-            tree = ast.parse(code)
-            usages = []
-            
-            # Собираем все имена в коде
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Name):
-                    # Проверяем, что это не присваивание (ctx=Store)
-                    if isinstance(node.ctx, ast.Load):
-                        usages.append(node.id)
-                elif isinstance(node, ast.Attribute):
-                    # Обрабатываем атрибуты (например, Class.method)
-                    attr_name = self._get_attr_name(node)
-                    # Извлекаем базовое имя (до первой точки)
-                    if '.' in attr_name:
-                        base_name = attr_name.split('.')[0]
-                        usages.append(base_name)
+        if isinstance(code, ast.AST):
+            tree = code
+        else:
+            # Парсим код в AST; обрабатываются только ошибки разбора
+            try:
+                tree = ast.parse(code)
+            except (SyntaxError, ValueError):
+                # Если не удалось распарсить, возвращаем пустой список
+                return []
+        
+        # Собираем все имена в коде сразу во множество. Базовое имя
+        # атрибута (Class в Class.method) - это тоже ast.Name в контексте
+        # Load, поэтому полные имена атрибутов строить не нужно
+        return list(_collect_load_names(tree))
+    
+    def get_usages_from_node(self, node: ast.AST, component_names: FrozenSet[str]) -> Set[str]:
+        """
+        Компоненты, используемые в уже разобранном узле AST
+        
+        Имена собираются обходом поддерева узла, без повторного парсинга его
+        кода, и пересекаются с множеством имен компонентов.
+        
+        Args:
+            node: Узел AST (класс, функция, присваивание)
+            component_names: Имена всех компонентов
             
-            # Фильтруем только уникальные использования
-            return list(set(usages))
-        except Exception as e:
-            # Если не удалось распарсить, возвращаем пустой список
-            return []
+        Returns:
+            Set[str]: Имена использованных компонентов
+        """
+        return _collect_load_names(node) & component_names
     
-    def get_all_usages(self) -> Dict[str, List[str]]:
+    def get_all_usages(self, components: Optional[Tuple[List[Dict[str, Any]], ...]] = None) -> Dict[str, List[str]]:
         """
         Анализ всех использований классов, функций и констант в коде
         
+        Использования собираются одним обходом AST узлов верхнего уровня,
+        без повторного парсинга кода каждого компонента. Строки и комментарии
+        не дают ложных совпадений.
+        
+        Args:
+            components: Уже извлеченные (classes, functions, constants),
+                чтобы не извлекать их повторно (по умолчанию извлекаются)
+        
         Returns:
             Dict[str, List[str]]: Словарь {component_name: [used_components]}
         """
         if not self.ast_tree:
             return {}
         
+        if components is None:
+            # Анализу нужны только имена, код компонентов не копируется
+            components = (self.get_classes(False), self.get_functions(False), self.get_constants(False))
+        
         # Собираем все имена компонентов
-        all_components = {}
-        for cls in self.get_classes():
-            all_components[cls['name']] = cls['code']
-        for func in self.get_functions():
-            all_components[func['name']] = func['code']
-        for const in self.get_constants():
-            all_components[const['name']] = const.get('code', '')
-        
-        # Анализируем использования для каждого компонента
+        all_components = frozenset(item['name'] for group in components for item in group)
+        
+        # Имена, читаемые в каждом компоненте верхнего уровня
+        collected: Dict[str, Set[str]] = {}
+        for node in self._index_body()[None]:
+            if isinstance(node, ast.Assign):
+                owners = [target.id for target in node.targets if isinstance(target, ast.Name)]
+            else:
+                owners = [node.name]
+            owners = [owner for owner in owners if owner in all_components]
+            if not owners:
+                continue
+            
+            used = self.get_usages_from_node(node, all_components)
+            for owner in owners:
+                collected.setdefault(owner, set()).update(used)
+        
+        # Оставляем только использования других компонентов
         usages = {}
-        for component_name, component_code in all_components.items():
-            component_usages = self.get_usages(component_name, component_code)
-            # Фильтруем только те использования, которые есть в списке компонентов
-            filtered_usages = [u for u in component_usages if u in all_components and u != component_name]
+        for component_name, names in collected.items():
+            filtered_usages = sorted(names - {component_name})
             if filtered_usages:
                 usages[component_name] = filtered_usages
         
         return usages
     
-    def get_structure(self) -> Dict[str, Any]:
+    def get_structure(self, include_source: bool = True) -> Dict[str, Any]:
         """
         Получение полной структуры файла
         
+        Args:
+            include_source: Добавлять код компонентов ('code'); для чисто
+                структурного анализа (имена, строки, использования) не нужен
+        
         Returns:
             Dict: Полная структура файла
         """
+        # Компоненты извлекаются один раз и переиспользуются анализом использований
+        classes = self.get_classes(include_source)
+        functions = self.get_functions(include_source)
+        constants = self.get_constants(include_source)
+        
         return {
             'file_path': self.file_path,
             'file_name': os.path.basename(self.file_path),
             'imports': self.get_imports(),
-            'classes': self.get_classes(),
-            'functions': self.get_functions(),
-            'constants': self.get_constants(),
-            'usages': self.get_all_usages(),  # Добавляем анализ использований
-            'total_lines': len(self.lines) if self.lines else 0
+            'classes': classes,
+            'functions': functions,
+            'constants': constants,
+            'usages': self.get_all_usages((classes, functions, constants)),  # Добавляем анализ использований
+            'total_lines': len(self.line_offsets)
         }
     
+    def release(self):
+        """
+        Освобождение исходника, AST и таблицы смещений после получения структуры
+        
+        Код компонентов в структуре - самостоятельные строки, поэтому после
+        get_structure парсер больше не нужен; освобождение не держит в памяти
+        копии файла и его дерева до конца дальнейшей обработки.
+        """
+        self.source_code = None
+        self.ast_tree = None
+        self.line_offsets = array('q')
+        self._tree_index = None
+        self._body_index = None
+    
+    def _index_body(self) -> Dict[Optional[type], List[ast.AST]]:
+        """
+        Единственный проход по узлам верхнего уровня
+        
+        Классы, функции и присваивания из tree.body раскладываются по типам
+        один раз; get_classes, get_functions, get_constants и get_all_usages
+        перебирают только свои узлы. Под ключом None - все три вида узлов
+        в порядке исходника.
+        
+        Returns:
+            Dict: {ast.ClassDef: [...], ast.FunctionDef: [...], ast.Assign: [...], None: [...]}
+        """
+        if self._body_index is not None:
+            return self._body_index
+        
+        body_index = {ast.ClassDef: [], ast.FunctionDef: [], ast.Assign: [], None: []}
+        in_order = body_index[None]
+        for node in self.ast_tree.body:
+            nodes = body_index.get(type(node))
+            if nodes is not None:
+                nodes.append(node)
+                in_order.append(node)
+        
+        self._body_index = body_index
+        return self._body_index
+    
+    def _index_tree(self) -> List[Dict[str, Any]]:
+        """
+        Единственный обход AST в поисках импортов
+        
+        Импорты всех уровней собираются обходом в ширину только по инструкциям
+        (и обработчикам except / case), без спуска в выражения; порядок тот же,
+        что у ast.walk. Результат кэшируется до следующего parse.
+        
+        Returns:
+            List[Dict]: Список импортов
+        """
+        if self._tree_index is not None:
+            return self._tree_index
+        
+        imports = []
+        todo = deque([self.ast_tree])
+        while todo:
+            node = todo.popleft()
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    imports.append({
+                        'type': 'import',
+                        'module': alias.name,
+                        'alias': alias.asname,
+                        'line': node.lineno
+                    })
+            elif isinstance(node, ast.ImportFrom):
+                module = node.module or ''
+                for alias in node.names:
+                    imports.append({
+                        'type': 'from_import',
+                        'module': module,
+                        'name': alias.name,
+                        'alias': alias.asname,
+                        'line': node.lineno
+                    })
+            else:
+                todo.extend(child for child in ast.iter_child_nodes(node) if isinstance(child, _STATEMENT_CONTAINERS))
+        
+        self._tree_index = imports
+        return self._tree_index
+    
+    def _get_source_lines(self, start_line: int, end_line: int) -> str:
+        """
+        Код строк start_line..end_line (1-based, включительно) одним срезом исходника
+        
+        Результат совпадает с '\\n'.join(lines[start_line - 1:end_line]).
+        """
+        line_offsets = self.line_offsets
+        if not line_offsets or start_line > len(line_offsets):
+            return ''
+        start = line_offsets[start_line - 1]
+        # Конец - перед переводом строки после end_line (или конец файла)
+        end = line_offsets[end_line] - 1 if end_line < len(line_offsets) else len(self.source_code)
+        return self.source_code[start:end]
+    
     def _get_class_methods(self, class_node: ast.ClassDef) -> List[Dict[str, Any]]:
         """Получение методов класса"""
         methods = []
@@ -365,52 +538,194 @@ class CodeParser:
         # Здесь упрощенная версия
         return None
     
-    def _get_attr_name(self, node: ast.Attribute) -> str:
+    @staticmethod
+    def _get_attr_name(node: ast.Attribute) -> str:
         """Получение полного имени атрибута"""
-        if isinstance(node.value, ast.Name):
-            return f"{node.value.id}.{node.attr}"
-        elif isinstance(node.value, ast.Attribute):
-            return f"{self._get_attr_name(node.value)}.{node.attr}"
-        return node.attr
+        # Цепочка a.b.c собирается за один проход вниз по node.value,
+        # без рекурсии и промежуточных строк на каждом уровне
+        parts = []
+        while type(node) is ast.Attribute:
+            parts.append(node.attr)
+            node = node.value
+        if type(node) is ast.Name:
+            parts.append(node.id)
+        return '.'.join(reversed(parts))
     
     def _get_decorator_name(self, node: ast.AST) -> str:
         """Получение имени декоратора"""
-        if isinstance(node, ast.Name):
-            return node.id
-        elif isinstance(node, ast.Attribute):
-            return self._get_attr_name(node)
-        elif isinstance(node, ast.Call):
-            if isinstance(node.func, ast.Name):
-                return node.func.id
-            elif isinstance(node.func, ast.Attribute):
-                return self._get_attr_name(node.func)
+        # Для вызова (@decorator(...)) имя берется из вызываемого выражения.
+        # Узлы AST не наследуются, поэтому точная проверка type() достаточна
+        # и дешевле isinstance; самый частый случай - простое имя
+        target = node.func if type(node) is ast.Call else node
+        target_type = type(target)
+        if target_type is ast.Name:
+            return target.id
+        if target_type is ast.Attribute:
+            return self._get_attr_name(target)
         return str(node)
     
     def _get_value_repr(self, node: ast.AST) -> str:
         """Получение строкового представления значения"""
-        if isinstance(node, ast.Str):
-            return node.s
-        elif isinstance(node, ast.Constant):
+        # ast.parse (3.8+) дает ast.Constant для строк и чисел; устаревшие
+        # ast.Str/ast.Num не проверяем (в 3.12+ это предупреждения)
+        node_type = type(node)
+        if node_type is ast.Constant:
             return str(node.value)
-        elif isinstance(node, ast.Name):
+        elif node_type is ast.Name:
             return node.id
-        elif isinstance(node, ast.Num):
-            return str(node.n)
+        elif hasattr(ast, 'unparse'):
+            # Исходный текст выражения вместо непрозрачного repr узла
+            return ast.unparse(node)
         return str(node)
 
 
-def parse_file(file_path: str) -> Optional[Dict[str, Any]]:
+def enable_console_logging(level: int = logging.WARNING) -> None:
+    """
+    Вывод сообщений ядра (парсера, разборщика) в консоль в привычном
+    формате "[ERROR] сообщение"
+    
+    Обработчик ставится на логгер приложения, дочерние логгеры модулей
+    передают ему свои сообщения.
+    
+    Args:
+        level: Минимальный уровень выводимых сообщений
+    """
+    app_logger = logging.getLogger('FSA-ProjectBuilder')
+    app_logger.setLevel(level)
+    if not app_logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter('[%(levelname)s] %(message)s'))
+        app_logger.addHandler(handler)
+
+
+def _structure_cache_path(cache_dir: str, file_path: str) -> str:
+    """Путь к файлу кэша структуры для исходного файла"""
+    digest = hashlib.blake2b(os.path.abspath(file_path).encode('utf-8'), digest_size=16).hexdigest()
+    return os.path.join(cache_dir, digest + '.json')
+
+
+def _load_cached_structure(cache_path: str, key: List[Any]) -> Optional[Dict[str, Any]]:
+    """Структура из кэша, если ключ (версии, путь, mtime и размер или хэш) совпадает"""
+    try:
+        # Кэш читается через orjson, если он установлен (загрузка в разы быстрее)
+        if _json_fast is not None:
+            with open(cache_path, 'rb') as f:
+                cache = _json_fast.loads(f.read())
+        else:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cache, dict) or cache.get('key') != key:
+        return None
+    return cache.get('structure')
+
+
+def _save_cached_structure(cache_path: str, key: List[Any], structure: Dict[str, Any]) -> None:
+    """Атомарная запись структуры в кэш (временный файл + os.replace)"""
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        cache = {'key': key, 'structure': structure}
+        if _json_fast is not None:
+            with open(tmp_path, 'wb') as f:
+                f.write(_json_fast.dumps(cache))
+        else:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning("Не удалось сохранить кэш структуры %s: %s", cache_path, e)
+
+
+def _structure_cache_key(file_path: str, content_key: bool) -> Optional[List[Any]]:
+    """
+    Ключ кэша структуры файла (None, если файл недоступен)
+    
+    По умолчанию ключ - mtime и размер (без чтения файла); с content_key -
+    SHA-256 содержимого, устойчивый к смене mtime при побайтно том же файле.
+    Версия Python входит в ключ: грамматика ast.parse и вывод ast.unparse
+    зависят от интерпретатора. Версия - список, чтобы ключ совпадал
+    с прочитанным из JSON.
+    """
+    python_version = list(sys.version_info[:2])
+    try:
+        if content_key:
+            with open(file_path, 'rb') as f:
+                return [STRUCTURE_CACHE_VERSION, python_version, file_path, 'sha256', hashlib.sha256(f.read()).hexdigest()]
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return [STRUCTURE_CACHE_VERSION, python_version, file_path, stat.st_mtime_ns, stat.st_size]
+
+
+def parse_file(file_path: str, cache_dir: Optional[str] = None,
+               content_key: bool = False) -> Optional[Dict[str, Any]]:
     """
     Удобная функция для парсинга файла
     
     Args:
         file_path: Путь к Python файлу
+        cache_dir: Директория кэша структур. Если задана, структура
+            неизмененного файла (тот же mtime и размер) берется из кэша
+            без чтения и парсинга
+        content_key: Считать файл неизмененным по SHA-256 содержимого,
+            а не по mtime и размеру
         
     Returns:
         Dict: Структура файла или None при ошибке
     """
+    cache_path = None
+    key = None
+    if cache_dir is not None:
+        key = _structure_cache_key(file_path, content_key)
+        if key is not None:
+            cache_path = _structure_cache_path(cache_dir, file_path)
+            structure = _load_cached_structure(cache_path, key)
+            if structure is not None:
+                logger.debug("Структура файла %s взята из кэша", file_path)
+                return structure
+    
     parser = CodeParser(file_path)
     if parser.parse():
-        return parser.get_structure()
+        structure = parser.get_structure()
+        parser.release()
+        if cache_path is not None:
+            _save_cached_structure(cache_path, key, structure)
+        return structure
     return None
 
+
+def parse_files(file_paths: Iterable[str], cache_dir: Optional[str] = None,
+                workers: Optional[int] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Парсинг нескольких файлов
+    
+    Парсинг - чистая работа CPU на Python, поэтому для большого числа файлов
+    он выполняется в отдельных процессах (в обход GIL).
+    
+    Args:
+        file_paths: Пути к Python файлам
+        cache_dir: Директория кэша структур (см. parse_file)
+        workers: Число процессов (по умолчанию - число CPU; 1 - без пула)
+        
+    Returns:
+        List: Структуры файлов (None при ошибке) в том же порядке
+    """
+    file_paths = list(file_paths)
+    parse = partial(parse_file, cache_dir=cache_dir)
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(file_paths) >= PROCESS_POOL_MIN_FILES:
+        # Импорт тянет multiprocessing, поэтому только когда пул действительно нужен
+        from concurrent.futures import ProcessPoolExecutor
+        # Пачки не крупнее PROCESS_POOL_CHUNKSIZE, но и не такие, чтобы
+        # на небольшом наборе файлов часть процессов осталась без работы
+        chunksize = max(1, min(PROCESS_POOL_CHUNKSIZE, len(file_paths) // (workers * 4)))
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(parse, file_paths, chunksize=chunksize))
+        except (OSError, RuntimeError) as e:
+            # Например, запуск процессов запрещен окружением
+            logger.warning("Параллельный парсинг недоступен, парсим последовательно: %s", e)
+    
+    return [parse(file_path) for file_path in file_paths]
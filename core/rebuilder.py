@@ -10,13 +10,73 @@ FSA-ProjectBuilder - Разборка файла на модули
 from __future__ import print_function
 import os
 import json
+import logging
+import re
 import shutil
 import ast
-from typing import Dict, List, Optional, Any, Set
-from .parser import CodeParser, parse_file
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Set, Tuple
+from .parser import parse_file
 from .dependency_resolver import DependencyResolver
 from config import DEFAULT_MODULES_DIR, DEFAULT_METADATA_DIR
 
+# Быстрая сериализация JSON (опционально), при отсутствии - стандартный json
+try:
+    import orjson as _json_fast
+except ImportError:
+    _json_fast = None
+
+# Логгер разборщика: дочерний к логгеру приложения (GUI пишет его в лог-файл)
+logger = logging.getLogger('FSA-ProjectBuilder.rebuilder')
+
+# Кэш структур исходных файлов в директории метаданных (по SHA-256 содержимого)
+STRUCTURE_CACHE_DIR = 'structure_cache'
+
+# Символы, после которых заглавная буква начинает новое слово (CamelCase -> snake_case)
+_LOWER_OR_DIGIT = frozenset('abcdefghijklmnopqrstuvwxyz0123456789')
+
+# Вызов без аргументов: ClassName()
+_EMPTY_CALL_RE = re.compile(r'(\w+)\(\)')
+
+# Импорт компонента из модуля категории: from category.module import Name
+_CATEGORY_IMPORT_RE = re.compile(r'^from\s+(\w+)\.(\w+)\s+import\s+(\w+)\s*$', re.MULTILINE)
+
+# Импорт функций из utils.runner_functions
+_RUNNER_FUNCTIONS_IMPORT_RE = re.compile(r'from\s+utils\.runner_functions\s+import\s+\w+')
+
+# Импорты из config: from config import name / import config
+_CONFIG_FROM_IMPORT_RE = re.compile(r'from\s+config\s+import\s+(\w+)')
+_CONFIG_IMPORT_RE = re.compile(r'^import\s+config\b', re.MULTILINE)
+
+# Окончание заголовка модуля класса (после имени класса) - одинаково для всех модулей
+_CLASS_MODULE_HEADER_SUFFIX = '''
+"""
+
+# Импортируем ВСЕ импорты и константы
+from imports import *
+
+'''
+
+
+def _write_if_changed(path: str, content: str) -> bool:
+    """
+    Запись текстового файла, только если его содержимое изменилось
+    
+    Неизмененный файл не перезаписывается и сохраняет свой mtime.
+    
+    Returns:
+        bool: True если файл записан, False если содержимое совпало
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except (OSError, UnicodeDecodeError):
+        pass
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True
+
 
 class Rebuilder:
     """Разборка Python файла на модули"""
@@ -42,6 +102,18 @@ class Rebuilder:
         self.metadata_dir = os.path.join(self.target_dir, DEFAULT_METADATA_DIR)
         self.structure = None
         self.module_mapping = {}  # {class_name: module_path}
+        # Категория и имя файла по пути модуля (вместо relpath при каждом обращении)
+        self._module_locations = {}  # {module_path: (category, module_file)}
+        # Категория класса по имени: вычисляется один раз на класс за всю разборку
+        self._class_categories = {}  # {class_name: category}
+        # Начало заголовка модуля класса (до имени класса) - собирается один раз
+        self._class_module_header_prefix = (
+            '#!/usr/bin/env python\n'
+            '# -*- coding: utf-8 -*-\n'
+            '"""\n'
+            f'Автоматически сгенерированный модуль из {self.source_name}\n'
+            'Класс: '
+        )
         # Имя исходного модуля (без расширения) для фильтрации внутренних импортов
         self.source_module_name = os.path.splitext(self.source_name)[0]
         # Флаги создания опциональных файлов
@@ -52,6 +124,10 @@ class Rebuilder:
         self.dependency_resolver = None
         # Динамически определяемые категории проекта
         self.project_categories = set()  # Множество категорий, используемых в проекте
+        # Модули, созданные при распределении компонентов (для __init__.py категорий)
+        self._category_modules = {}  # {category: [module_name]}
+        # Сгенерированные файлы до записи на диск (второй проход обрабатывает их в памяти)
+        self._staged_files = {}  # {path: content}
         
     def rebuild(self) -> bool:
         """
@@ -63,13 +139,16 @@ class Rebuilder:
         print(f"[REBUILD] Начало разборки файла: {self.source_file}")
         
         # 1. Парсим исходный файл
+        # Побайтно тот же исходник повторно не парсится: структура берется
+        # из кэша в директории метаданных
         print("[REBUILD] Парсинг исходного файла...")
-        parser = CodeParser(self.source_file)
-        if not parser.parse():
+        self.structure = parse_file(self.source_file,
+                                    cache_dir=os.path.join(self.metadata_dir, STRUCTURE_CACHE_DIR),
+                                    content_key=True)
+        if self.structure is None:
             print("[ERROR] Ошибка парсинга исходного файла")
             return False
         
-        self.structure = parser.get_structure()
         print(f"[REBUILD] Найдено: {len(self.structure['classes'])} классов, "
               f"{len(self.structure['functions'])} функций, "
               f"{len(self.structure['imports'])} импортов")
@@ -91,30 +170,33 @@ class Rebuilder:
             print("[ERROR] Ошибка распределения компонентов")
             return False
         
-        # 4. Генерируем __init__.py файлы
-        print("[REBUILD] Генерация __init__.py файлов...")
-        if not self._generate_init_files():
+        # 4-6. Генерируем __init__.py файлы, сохраняем метаданные и создаем файл запуска.
+        # Шаги независимы: после распределения компонентов структура и mapping
+        # только читаются, а каждый шаг пишет свои файлы - выполняем их параллельно
+        print("[REBUILD] Генерация __init__.py файлов, сохранение метаданных, создание файла запуска...")
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            init_future = executor.submit(self._generate_init_files)
+            metadata_future = executor.submit(self._save_metadata)
+            launcher_future = executor.submit(self._generate_launcher_file)
+        
+        if not init_future.result():
             print("[ERROR] Ошибка генерации __init__.py файлов")
             return False
         
-        # 5. Сохраняем метаданные
-        print("[REBUILD] Сохранение метаданных...")
-        if not self._save_metadata():
+        if not metadata_future.result():
             print("[ERROR] Ошибка сохранения метаданных")
             return False
         
-        # 5.5. Обрабатываем config.py - добавляем недостающие импорты (только если был создан)
+        if not launcher_future.result():
+            print("[WARNING] Не удалось создать файл запуска (не критично)")
+        
+        # Обрабатываем config.py - добавляем недостающие импорты (только если был создан)
         if self.config_created:
             print("[REBUILD] Обработка config.py...")
             self._process_config_imports()
         else:
             print("[REBUILD] config.py не создан (нет констант), пропускаем обработку")
         
-        # 6. Создаем файл запуска
-        print("[REBUILD] Создание файла запуска...")
-        if not self._generate_launcher_file():
-            print("[WARNING] Не удалось создать файл запуска (не критично)")
-        
         print(f"[SUCCESS] Разборка завершена успешно!")
         print(f"[INFO] Модули созданы в: {self.target_dir}")
         return True
@@ -133,8 +215,7 @@ class Rebuilder:
         
         # Определяем категории на основе классов
         for cls in self.structure.get('classes', []):
-            category = self._determine_category(cls)
-            categories.add(category)
+            categories.add(self._class_category(cls))
         
         # Определяем категории на основе функций (utils)
         if self.structure.get('functions', []):
@@ -167,10 +248,9 @@ class Rebuilder:
             component_category = None
             if component_name in self.module_mapping:
                 component_path = self.module_mapping[component_name]
-                rel_path = os.path.relpath(component_path, self.target_dir)
-                parts = rel_path.split(os.sep)
-                if len(parts) >= 2:
-                    component_category = parts[0]
+                location = self._module_location(component_path)
+                if location:
+                    component_category = location[0]
             elif self.structure and 'functions' in self.structure:
                 for func in self.structure.get('functions', []):
                     if func['name'] == component_name:
@@ -186,10 +266,9 @@ class Rebuilder:
                     dep_category = None
                     if dep in self.module_mapping:
                         dep_path = self.module_mapping[dep]
-                        rel_path = os.path.relpath(dep_path, self.target_dir)
-                        parts = rel_path.split(os.sep)
-                        if len(parts) >= 2:
-                            dep_category = parts[0]
+                        location = self._module_location(dep_path)
+                        if location:
+                            dep_category = location[0]
                     elif self.structure and 'functions' in self.structure:
                         for func in self.structure.get('functions', []):
                             if func['name'] == dep:
@@ -223,24 +302,16 @@ class Rebuilder:
     def _create_structure(self) -> bool:
         """Создание структуры папок"""
         try:
-            # Создаем основную директорию
-            os.makedirs(self.target_dir, exist_ok=True)
-            
-            # Создаем директорию для метаданных
-            os.makedirs(self.metadata_dir, exist_ok=True)
-            
             # Определяем категории проекта динамически
             self.project_categories = self._get_project_categories()
             
-            # Создаем директории только для категорий, используемых в проекте
-            for category in self.project_categories:
-                category_dir = os.path.join(self.target_dir, category)
-                os.makedirs(category_dir, exist_ok=True)
-            
-            # Также создаем директорию для utils, если есть функции
-            if self.structure and self.structure.get('functions', []):
-                utils_dir = os.path.join(self.target_dir, 'utils')
-                os.makedirs(utils_dir, exist_ok=True)
+            # Директория метаданных вложена в основную и создает ее вместе с собой.
+            # Директории создаются только для категорий, используемых в проекте
+            # (utils входит в них, если есть функции)
+            directories = [self.metadata_dir]
+            directories.extend(os.path.join(self.target_dir, category) for category in sorted(self.project_categories))
+            for directory in directories:
+                os.makedirs(directory, exist_ok=True)
             
             return True
         except Exception as e:
@@ -252,14 +323,18 @@ class Rebuilder:
         try:
             # Сохраняем порядок классов из исходного файла
             self.class_order = [cls['name'] for cls in self.structure.get('classes', [])]
+            self._category_modules = {}
             
             # Первый проход: создаем все модули и заполняем mapping
-            # Распределяем классы
+            # Распределяем классы (файлы пишутся на диск после второго прохода)
             for cls in self.structure['classes']:
-                category = self._determine_category(cls)
+                category = self._class_category(cls)
                 module_path = self._create_module_file(category, cls['name'], cls['code'], replace_imports=False)
                 if module_path:
+                    print(f"[REBUILD] Создан модуль: {module_path}")
                     self.module_mapping[cls['name']] = module_path
+                    self._module_locations[module_path] = (category, os.path.basename(module_path))
+                    self._category_modules.setdefault(category, []).append(cls['name'])
             
             # Распределяем функции верхнего уровня
             utils_functions = []
@@ -282,36 +357,32 @@ class Rebuilder:
             if main_function:
                 main_code = self._generate_main_code(main_function)
                 main_path = os.path.join(self.target_dir, 'utils', 'main.py')
-                os.makedirs(os.path.dirname(main_path), exist_ok=True)
-                with open(main_path, 'w', encoding='utf-8') as f:
-                    f.write(main_code)
+                self._staged_files[main_path] = main_code
+                self._category_modules.setdefault('utils', []).append('main')
                 print(f"[REBUILD] Создан utils/main.py с функцией main()")
             
             # Создаем utils/runner_functions.py для функций run_* (если есть)
             if runner_functions:
                 runner_code = self._generate_runner_functions_code(runner_functions)
                 runner_path = os.path.join(self.target_dir, 'utils', 'runner_functions.py')
-                os.makedirs(os.path.dirname(runner_path), exist_ok=True)
-                with open(runner_path, 'w', encoding='utf-8') as f:
-                    f.write(runner_code)
+                self._staged_files[runner_path] = runner_code
+                self._category_modules.setdefault('utils', []).append('runner_functions')
                 print(f"[REBUILD] Создан utils/runner_functions.py с {len(runner_functions)} функциями")
             
             # Создаем utils/cleanup.py для функций cleanup_* (если есть)
             if cleanup_functions:
                 cleanup_code = self._generate_cleanup_code(cleanup_functions)
                 cleanup_path = os.path.join(self.target_dir, 'utils', 'cleanup.py')
-                os.makedirs(os.path.dirname(cleanup_path), exist_ok=True)
-                with open(cleanup_path, 'w', encoding='utf-8') as f:
-                    f.write(cleanup_code)
+                self._staged_files[cleanup_path] = cleanup_code
+                self._category_modules.setdefault('utils', []).append('cleanup')
                 print(f"[REBUILD] Создан utils/cleanup.py с {len(cleanup_functions)} функциями")
             
             # Создаем utils/utils.py для остальных функций (если есть)
             if utils_functions:
                 utils_code = self._generate_utils_code(utils_functions, replace_imports=False)
                 utils_path = os.path.join(self.target_dir, 'utils', 'utils.py')
-                os.makedirs(os.path.dirname(utils_path), exist_ok=True)
-                with open(utils_path, 'w', encoding='utf-8') as f:
-                    f.write(utils_code)
+                self._staged_files[utils_path] = utils_code
+                self._category_modules.setdefault('utils', []).append('utils')
                 print(f"[REBUILD] Создан utils/utils.py с {len(utils_functions)} функциями")
             
             # config.py больше не создаем - константы теперь в imports.py
@@ -322,8 +393,7 @@ class Rebuilder:
             if imports or constants:
                 imports_code = self._generate_imports_code(imports, constants)
                 imports_path = os.path.join(self.target_dir, 'imports.py')
-                with open(imports_path, 'w', encoding='utf-8') as f:
-                    f.write(imports_code)
+                self._staged_files[imports_path] = imports_code
                 self.imports_created = True
                 print(f"[REBUILD] Создан imports.py с {len(imports)} импортами и {len(constants)} константами")
             
@@ -331,8 +401,7 @@ class Rebuilder:
             if hasattr(self, 'global_init') and self.global_init:
                 init_code = self._generate_global_init_code()
                 init_path = os.path.join(self.target_dir, 'init.py')
-                with open(init_path, 'w', encoding='utf-8') as f:
-                    f.write(init_code)
+                self._staged_files[init_path] = init_code
                 print(f"[REBUILD] Создан init.py для инициализации {len(self.global_init)} глобальных переменных")
             
             # Второй проход: заменяем внутренние импорты во всех модулях
@@ -340,11 +409,75 @@ class Rebuilder:
             self._replace_imports_in_all_modules()
             
             return True
-        except Exception as e:
-            print(f"[ERROR] Ошибка распределения компонентов: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            # Трассировка форматируется обработчиком логгера, только если он ее выводит
+            logger.exception("Ошибка распределения компонентов")
             return False
+        finally:
+            # Записываем все сгенерированные файлы (и при ошибке - уже созданные)
+            self._write_staged_files()
+    
+    def _class_category(self, cls: Dict[str, Any]) -> str:
+        """
+        Категория класса с запоминанием по имени
+        
+        Категория нужна при сборе категорий проекта, распределении классов
+        и генерации файла запуска; правила применяются к имени один раз.
+        
+        Args:
+            cls: Класс из структуры
+            
+        Returns:
+            str: Категория модуля
+        """
+        category = self._class_categories.get(cls['name'])
+        if category is None:
+            category = self._determine_category(cls)
+            self._class_categories[cls['name']] = category
+        return category
+    
+    def _module_location(self, module_path: str) -> Optional[Tuple[str, str]]:
+        """
+        Категория и имя файла модуля по его пути
+        
+        Args:
+            module_path: Путь к модулю (из module_mapping)
+            
+        Returns:
+            Tuple: (категория, имя файла) или None, если модуль вне категории
+        """
+        location = self._module_locations.get(module_path)
+        if location is None:
+            parts = os.path.relpath(module_path, self.target_dir).split(os.sep)
+            location = (parts[0], parts[1]) if len(parts) >= 2 else ()
+            self._module_locations[module_path] = location
+        return location or None
+    
+    def _write_staged_files(self) -> None:
+        """
+        Запись сгенерированных файлов на диск
+        
+        Файлы с неизмененным содержимым не перезаписываются, чтобы при повторной
+        разборке сохранить их mtime (на него опирается кэш модулей сборщика).
+        Файлы независимы и пишутся параллельно.
+        """
+        staged = list(self._staged_files.items())
+        self._staged_files = {}
+        
+        def write(item):
+            try:
+                return _write_if_changed(*item)
+            except OSError as e:
+                print(f"[ERROR] Ошибка записи файла {item[0]}: {e}")
+                return None
+        
+        max_workers = max(1, min(32, len(staged)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            written = list(executor.map(write, staged))
+        
+        unchanged = written.count(False)
+        if unchanged:
+            print(f"[REBUILD] Без изменений (не перезаписаны): {unchanged} из {len(staged)} файлов")
     
     def _determine_category(self, component: Dict[str, Any]) -> str:
         """
@@ -433,25 +566,13 @@ class Rebuilder:
             else:
                 processed_code = code_without_constants
             
-            # Добавляем заголовок файла с импортом из imports.py
-            header = f'''#!/usr/bin/env python
-# -*- coding: utf-8 -*-
-"""
-Автоматически сгенерированный модуль из {self.source_name}
-Класс: {class_name}
-"""
-
-# Импортируем ВСЕ импорты и константы
-from imports import *
-
-'''
+            # Добавляем заголовок файла с импортом из imports.py (части заголовка
+            # заготовлены заранее, в модуле меняется только имя класса)
+            # Файл записывается после второго прохода (_write_staged_files)
+            self._staged_files[module_path] = ''.join((
+                self._class_module_header_prefix, class_name, _CLASS_MODULE_HEADER_SUFFIX, processed_code
+            ))
             
-            # Записываем файл
-            with open(module_path, 'w', encoding='utf-8') as f:
-                f.write(header)
-                f.write(processed_code)
-            
-            print(f"[REBUILD] Создан модуль: {module_path}")
             return module_path
             
         except Exception as e:
@@ -459,11 +580,31 @@ from imports import *
             return None
     
     def _class_name_to_module_name(self, class_name: str) -> str:
-        """Преобразование имени класса в имя модуля (больше не используется, оставлено для совместимости)"""
-        # CamelCase -> snake_case
-        import re
-        s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', class_name)
-        return re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower()
+        """
+        Преобразование имени класса в snake_case имя модуля
+        
+        Используется при сопоставлении классов с модулями категории
+        (зависимости в __init__.py) и при проверке импорта класса из самого себя.
+        
+        Args:
+            class_name: Имя класса (CamelCase)
+            
+        Returns:
+            str: Имя модуля в snake_case
+        """
+        # CamelCase -> snake_case за один проход (результат как у пары замен
+        # '(.)([A-Z][a-z]+)' и '([a-z0-9])([A-Z])'): '_' ставится перед заглавной
+        # буквой после строчной или цифры либо перед началом слова 'Xyz'
+        chars = []
+        prev = ''
+        last = len(class_name) - 1
+        for i, char in enumerate(class_name):
+            if 'A' <= char <= 'Z' and i and (prev in _LOWER_OR_DIGIT or
+                                             (i < last and 'a' <= class_name[i + 1] <= 'z')):
+                chars.append('_')
+            chars.append(char)
+            prev = char
+        return ''.join(chars).lower()
     
     def _remove_imports_from_code(self, code: str) -> str:
         """
@@ -636,10 +777,17 @@ from imports import *
         if not code:
             return code
         
-        lines = code.split('\n')
-        if not lines:
+        # Быстрый путь: код начинается без отступа (обычный случай для
+        # компонентов верхнего уровня) - разбивать его на строки не нужно
+        if not code[0].isspace():
             return code
         
+        # Быстрый путь для однострочного кода (например, константы)
+        if '\n' not in code:
+            return code.lstrip() if code.strip() else code
+        
+        lines = code.split('\n')
+        
         # Находим первую непустую строку и её отступ
         first_line_indent = 0
         for line in lines:
@@ -677,7 +825,7 @@ from imports import *
 from imports import *
 
 '''
-        code = header
+        code_parts = [header]
         
         func_code = main_function.get('code', '')
         # Нормализуем отступы кода функции (убираем минимальный отступ)
@@ -691,9 +839,9 @@ from imports import *
         processed_code = self._replace_internal_imports(code_without_constants, 'utils', 'main')
         # Удаляем импорты еще раз, так как _replace_internal_imports может добавить их
         # Но теперь они уже правильные (относительные), поэтому оставляем их
-        code += processed_code + '\n'
+        code_parts.append(processed_code + '\n')
         
-        return code
+        return ''.join(code_parts)
     
     def _generate_runner_functions_code(self, functions: List[Dict[str, Any]]) -> str:
         """Генерация кода для utils/runner_functions.py"""
@@ -708,7 +856,7 @@ from imports import *
 from imports import *
 
 '''
-        code = header
+        code_parts = [header]
         
         constants = self.structure.get('constants', [])
         
@@ -722,9 +870,9 @@ from imports import *
             code_without_constants = self._remove_constants_from_code(code_without_imports, constants, use_line_numbers=False)
             # Заменяем внутренние импорты
             processed_code = self._replace_internal_imports(code_without_constants, 'utils', func.get('name', ''))
-            code += processed_code + '\n\n'
+            code_parts.append(processed_code + '\n\n')
         
-        return code
+        return ''.join(code_parts)
     
     def _generate_cleanup_code(self, functions: List[Dict[str, Any]]) -> str:
         """Генерация кода для utils/cleanup.py"""
@@ -739,7 +887,7 @@ from imports import *
 from imports import *
 
 '''
-        code = header
+        code_parts = [header]
         
         constants = self.structure.get('constants', [])
         
@@ -753,9 +901,9 @@ from imports import *
             code_without_constants = self._remove_constants_from_code(code_without_imports, constants, use_line_numbers=False)
             # Заменяем внутренние импорты
             processed_code = self._replace_internal_imports(code_without_constants, 'utils', func.get('name', ''))
-            code += processed_code + '\n\n'
+            code_parts.append(processed_code + '\n\n')
         
-        return code
+        return ''.join(code_parts)
     
     def _generate_utils_code(self, functions: List[Dict[str, Any]], replace_imports: bool = True) -> str:
         """Генерация кода для utils/utils.py"""
@@ -770,7 +918,7 @@ from imports import *
 from imports import *
 
 '''
-        code = header
+        code_parts = [header]
         
         constants = self.structure.get('constants', [])
         
@@ -787,9 +935,9 @@ from imports import *
                 processed_code = self._replace_internal_imports(code_without_constants, 'utils', func.get('name', ''))
             else:
                 processed_code = code_without_constants
-            code += processed_code + '\n\n'
+            code_parts.append(processed_code + '\n\n')
         
-        return code
+        return ''.join(code_parts)
     
     def _generate_config_code(self, constants: List[Dict[str, Any]]) -> str:
         """Генерация кода для config.py"""
@@ -801,16 +949,16 @@ from imports import *
 """
 
 '''
-        code = header
+        code_parts = [header]
         
         for const in constants:
             # Используем исходный код присваивания если есть, иначе значение
             if 'code' in const and const['code']:
-                code += const['code'] + '\n'
+                code_parts.append(const['code'] + '\n')
             else:
-                code += f"{const['name']} = {const['value']}\n"
+                code_parts.append(f"{const['name']} = {const['value']}\n")
         
-        return code
+        return ''.join(code_parts)
     
     def _generate_imports_code(self, imports: List[Dict[str, Any]], constants: List[Dict[str, Any]]) -> str:
         """Генерация кода для imports.py (импорты и константы)"""
@@ -823,7 +971,7 @@ from imports import *
 """
 
 '''
-        code = header
+        code_parts = [header]
         
         # Разделяем константы на простые и инициализацию глобальных переменных
         simple_constants = []  # Простые константы (APP_VERSION, COMPONENTS_CONFIG)
@@ -875,82 +1023,75 @@ from imports import *
             import_statements = []
             from_imports = {}
             
+            # Один проход: тип, модуль и псевдоним читаются один раз,
+            # каждая ветка только добавляет строку в свою группу
             for imp in imports:
+                imp_type = imp['type']
+                module = imp.get('module')
                 # Пропускаем импорты из исходного файла (внутренние импорты)
-                if imp['type'] == 'from_import' and imp.get('module') == self.source_module_name:
-                    continue  # Исключаем внутренние импорты
+                if module == self.source_module_name and imp_type in ('import', 'from_import'):
+                    continue
                 
-                # Импорты из __future__ должны быть первыми
-                if imp['type'] == 'from_import' and imp.get('module') == '__future__':
-                    name = imp['name']
-                    alias = f" as {imp['alias']}" if imp.get('alias') else ""
-                    future_imports.append(f"{name}{alias}")
-                elif imp['type'] == 'import':
-                    # Пропускаем импорты исходного файла
-                    if imp['module'] == self.source_module_name:
-                        continue
-                    alias = f" as {imp['alias']}" if imp.get('alias') else ""
-                    import_statements.append(f"import {imp['module']}{alias}")
-                elif imp['type'] == 'from_import':
-                    module = imp['module']
-                    if module not in from_imports:
-                        from_imports[module] = []
-                    name = imp['name']
-                    alias = f" as {imp['alias']}" if imp.get('alias') else ""
-                    from_imports[module].append(f"{name}{alias}")
+                alias = f" as {imp['alias']}" if imp.get('alias') else ""
+                if imp_type == 'import':
+                    import_statements.append(f"import {module}{alias}")
+                elif imp_type == 'from_import':
+                    # Импорты из __future__ должны быть первыми
+                    if module == '__future__':
+                        future_imports.append(f"{imp['name']}{alias}")
+                    else:
+                        from_imports.setdefault(module, []).append(f"{imp['name']}{alias}")
         
         # Добавляем импорты из __future__ первыми
         if future_imports:
             names = ', '.join(sorted(set(future_imports)))
-            code += f"from __future__ import {names}\n\n"
+            code_parts.append(f"from __future__ import {names}\n\n")
         
         # Добавляем import
         for stmt in sorted(set(import_statements)):
-            code += stmt + '\n'
+            code_parts.append(stmt + '\n')
         
         # Добавляем from ... import (кроме __future__, он уже добавлен)
-        for module in sorted(from_imports.keys()):
-            if module != '__future__':
-                names = ', '.join(from_imports[module])
-                code += f"from {module} import {names}\n"
-            
-            code += '\n'
+        for module in sorted(from_imports):
+            names = ', '.join(from_imports[module])
+            code_parts.append(f"from {module} import {names}\n")
+            code_parts.append('\n')
         
         # ============================================================================
         # КОНСТАНТЫ
         # ============================================================================
         if simple_constants:
-            code += '# ============================================================================\n'
-            code += '# КОНСТАНТЫ\n'
-            code += '# ============================================================================\n\n'
+            code_parts.append('# ============================================================================\n')
+            code_parts.append('# КОНСТАНТЫ\n')
+            code_parts.append('# ============================================================================\n\n')
             
             for const in simple_constants:
                 # Используем исходный код присваивания
                 if 'code' in const and const['code']:
-                    code += const['code'] + '\n'
+                    code_parts.append(const['code'] + '\n')
                 else:
                     # Fallback: если нет кода, создаем простое присваивание
-                    code += f"{const['name']} = {const.get('value', 'None')}\n"
+                    code_parts.append(f"{const['name']} = {const.get('value', 'None')}\n")
             
-            code += '\n'
+            code_parts.append('\n')
         
         # ============================================================================
         # ГЛОБАЛЬНЫЕ ПЕРЕМЕННЫЕ (инициализация как None)
         # ============================================================================
         if global_init:
-            code += '# ============================================================================\n'
-            code += '# ГЛОБАЛЬНЫЕ ПЕРЕМЕННЫЕ (инициализация)\n'
-            code += '# ============================================================================\n'
-            code += '# ВАЖНО: Создание экземпляров классов будет выполнено в init.py\n'
-            code += '# после импорта всех классов\n'
-            code += '# ============================================================================\n\n'
+            code_parts.append('# ============================================================================\n')
+            code_parts.append('# ГЛОБАЛЬНЫЕ ПЕРЕМЕННЫЕ (инициализация)\n')
+            code_parts.append('# ============================================================================\n')
+            code_parts.append('# ВАЖНО: Создание экземпляров классов будет выполнено в init.py\n')
+            code_parts.append('# после импорта всех классов\n')
+            code_parts.append('# ============================================================================\n\n')
             
             for init_var in global_init:
-                code += init_var['init_code'] + '\n'
+                code_parts.append(init_var['init_code'] + '\n')
             
-            code += '\n'
+            code_parts.append('\n')
         
-        return code
+        return ''.join(code_parts)
     
     def _generate_global_init_code(self) -> str:
         """
@@ -969,24 +1110,23 @@ from imports import *
 from imports import *
 
 '''
-        code = header
+        code_parts = [header]
         
         # Добавляем создание экземпляров классов
         if hasattr(self, 'global_init') and self.global_init:
             # Сначала импортируем нужные классы
-            code += '# ============================================================================\n'
-            code += '# ИМПОРТ КЛАССОВ ДЛЯ ИНИЦИАЛИЗАЦИИ\n'
-            code += '# ============================================================================\n'
-            code += '# ВАЖНО: Классы должны быть импортированы ДО создания экземпляров\n'
-            code += '# ============================================================================\n\n'
+            code_parts.append('# ============================================================================\n')
+            code_parts.append('# ИМПОРТ КЛАССОВ ДЛЯ ИНИЦИАЛИЗАЦИИ\n')
+            code_parts.append('# ============================================================================\n')
+            code_parts.append('# ВАЖНО: Классы должны быть импортированы ДО создания экземпляров\n')
+            code_parts.append('# ============================================================================\n\n')
             
             # Определяем, какие классы нужны для инициализации
             needed_classes = set()
             for init_var in self.global_init:
                 original_code = init_var['original_code']
                 # Ищем вызовы классов в коде (например, ActivityTracker())
-                import re
-                class_calls = re.findall(r'(\w+)\(\)', original_code)
+                class_calls = _EMPTY_CALL_RE.findall(original_code)
                 for class_name in class_calls:
                     # Проверяем, что это действительно класс (есть в структуре)
                     if class_name in self.module_mapping:
@@ -997,55 +1137,45 @@ from imports import *
                 # Определяем категорию класса
                 if class_name in self.module_mapping:
                     module_path = self.module_mapping[class_name]
-                    rel_path = os.path.relpath(module_path, self.target_dir)
-                    parts = rel_path.split(os.sep)
-                    if len(parts) >= 2:
-                        category = parts[0]
-                        code += f"from {category}.{class_name} import {class_name}\n"
+                    location = self._module_location(module_path)
+                    if location:
+                        category = location[0]
+                        code_parts.append(f"from {category}.{class_name} import {class_name}\n")
             
-            code += '\n'
+            code_parts.append('\n')
             
             # Теперь создаем экземпляры
-            code += '# ============================================================================\n'
-            code += '# ИНИЦИАЛИЗАЦИЯ ГЛОБАЛЬНЫХ ПЕРЕМЕННЫХ\n'
-            code += '# ============================================================================\n'
-            code += '# ВАЖНО: Этот код выполняется ПОСЛЕ импорта всех классов\n'
-            code += '# ============================================================================\n\n'
+            code_parts.append('# ============================================================================\n')
+            code_parts.append('# ИНИЦИАЛИЗАЦИЯ ГЛОБАЛЬНЫХ ПЕРЕМЕННЫХ\n')
+            code_parts.append('# ============================================================================\n')
+            code_parts.append('# ВАЖНО: Этот код выполняется ПОСЛЕ импорта всех классов\n')
+            code_parts.append('# ============================================================================\n\n')
             
             for init_var in self.global_init:
                 # Используем оригинальный код создания экземпляра
-                code += init_var['original_code'] + '\n'
+                code_parts.append(init_var['original_code'] + '\n')
             
-            code += '\n'
+            code_parts.append('\n')
         
-        return code
+        return ''.join(code_parts)
     
     def _generate_init_files(self) -> bool:
         """Генерация __init__.py файлов"""
         try:
-            # Генерируем __init__.py для каждой категории проекта
+            # Генерируем __init__.py для каждой категории проекта по модулям,
+            # созданным при распределении компонентов (без повторного чтения директорий)
             for category in self.project_categories:
-                category_dir = os.path.join(self.target_dir, category)
-                if os.path.exists(category_dir):
-                    # Находим все модули в категории
-                    modules = []
-                    for file in os.listdir(category_dir):
-                        if file.endswith('.py') and file != '__init__.py':
-                            module_name = file[:-3]  # Убираем .py
-                            modules.append(module_name)
-                    
-                    if modules:
-                        # Генерируем __init__.py
-                        init_code = self._generate_init_code(category, modules)
-                        init_path = os.path.join(category_dir, '__init__.py')
-                        with open(init_path, 'w', encoding='utf-8') as f:
-                            f.write(init_code)
+                modules = self._category_modules.get(category)
+                if modules:
+                    # Генерируем __init__.py
+                    init_code = self._generate_init_code(category, modules)
+                    init_path = os.path.join(self.target_dir, category, '__init__.py')
+                    _write_if_changed(init_path, init_code)
             
             # Генерируем главный __init__.py
             main_init_code = self._generate_main_init_code()
             main_init_path = os.path.join(self.target_dir, '__init__.py')
-            with open(main_init_path, 'w', encoding='utf-8') as f:
-                f.write(main_init_code)
+            _write_if_changed(main_init_path, main_init_code)
             
             return True
         except Exception as e:
@@ -1054,39 +1184,45 @@ from imports import *
     
     def _generate_init_code(self, category: str, modules: List[str]) -> str:
         """Генерация кода для __init__.py категории"""
-        code = f'''"""
+        code_parts = [f'''"""
 {category.capitalize()} модули
 """
 
-'''
+''']
         # Определяем порядок импорта на основе зависимостей
         # Используем DependencyResolver для определения порядка
         if self.structure and 'classes' in self.structure:
+            # Классы структуры по имени (первый при повторах) и множество модулей
+            # категории: поиск класса и проверки принадлежности за O(1)
+            # вместо просмотра списков для каждого модуля
+            classes_by_name = {}
+            for cls in self.structure.get('classes', []):
+                classes_by_name.setdefault(cls['name'], cls)
+            module_set = set(modules)
+            usages = self.structure.get('usages', {})
+            
             # Создаем словарь зависимостей для модулей этой категории
             module_dependencies = {}
             for module in modules:
                 # Ищем класс с таким именем (snake_case -> CamelCase)
                 class_name = self._module_name_to_class_name(module)
-                # Ищем класс в структуре
-                for cls in self.structure.get('classes', []):
-                    if cls['name'] == class_name:
-                        # Получаем зависимости класса
-                        deps = set()
-                        # Зависимости от базовых классов
-                        for base in cls.get('bases', []):
-                            # Проверяем, есть ли этот класс в модулях этой категории
-                            base_module = self._class_name_to_module_name(base)
-                            if base_module in modules:
-                                deps.add(base_module)
-                        # Зависимости из анализа использований
-                        usages = self.structure.get('usages', {})
-                        if class_name in usages:
-                            for used in usages[class_name]:
-                                used_module = self._class_name_to_module_name(used)
-                                if used_module in modules:
-                                    deps.add(used_module)
-                        module_dependencies[module] = deps
-                        break
+                cls = classes_by_name.get(class_name)
+                if cls is None:
+                    continue
+                # Получаем зависимости класса
+                deps = set()
+                # Зависимости от базовых классов
+                for base in cls.get('bases', []):
+                    # Проверяем, есть ли этот класс в модулях этой категории
+                    base_module = self._class_name_to_module_name(base)
+                    if base_module in module_set:
+                        deps.add(base_module)
+                # Зависимости из анализа использований
+                for used in usages.get(class_name, ()):
+                    used_module = self._class_name_to_module_name(used)
+                    if used_module in module_set:
+                        deps.add(used_module)
+                module_dependencies[module] = deps
             
             # Топологическая сортировка модулей
             sorted_modules = self._topological_sort_modules(modules, module_dependencies)
@@ -1128,10 +1264,9 @@ from imports import *
                             # Проверяем, является ли зависимость классом из этой категории
                             if dep in self.module_mapping:
                                 dep_path = self.module_mapping[dep]
-                                rel_path = os.path.relpath(dep_path, self.target_dir)
-                                parts = rel_path.split(os.sep)
-                                if len(parts) >= 2:
-                                    dep_category = parts[0]
+                                location = self._module_location(dep_path)
+                                if location:
+                                    dep_category = location[0]
                                     if dep_category == category:
                                         utils_imports_category = True
                                         break
@@ -1160,16 +1295,15 @@ from imports import *
             if module in modules_with_cycles:
                 # Не импортируем модули с циклическими зависимостями в __init__.py
                 # Они будут импортированы напрямую из модулей там, где нужны
-                code += f"# Модуль {module} имеет циклические зависимости - не импортируем в __init__.py\n"
-                code += f"# Импортируйте классы напрямую: from {category}.{module} import ClassName\n\n"
+                code_parts.append(f"# Модуль {module} имеет циклические зависимости - не импортируем в __init__.py\n")
+                code_parts.append(f"# Импортируйте классы напрямую: from {category}.{module} import ClassName\n\n")
             else:
-                code += f"from .{module} import *\n"
+                code_parts.append(f"from .{module} import *\n")
         
-        return code
+        return ''.join(code_parts)
     
     def _module_name_to_class_name(self, module_name: str) -> str:
         """Преобразование имени модуля в имя класса (snake_case -> CamelCase)"""
-        import re
         parts = module_name.split('_')
         return ''.join(word.capitalize() for word in parts)
     
@@ -1200,11 +1334,11 @@ from imports import *
     
     def _generate_main_init_code(self) -> str:
         """Генерация главного __init__.py"""
-        code = f'''"""
+        code_parts = [f'''"""
 Автоматически сгенерированные модули из {self.source_name}
 """
 
-'''
+''']
         # Определяем категории с циклическими зависимостями
         # Проверяем циклические зависимости между категориями через граф зависимостей
         categories_with_cycles = set()
@@ -1217,10 +1351,9 @@ from imports import *
             component_category = None
             if component_name in self.module_mapping:
                 component_path = self.module_mapping[component_name]
-                rel_path = os.path.relpath(component_path, self.target_dir)
-                parts = rel_path.split(os.sep)
-                if len(parts) >= 2:
-                    component_category = parts[0]
+                location = self._module_location(component_path)
+                if location:
+                    component_category = location[0]
             else:
                 # Проверяем, является ли компонент функцией из utils
                 if self.structure and 'functions' in self.structure:
@@ -1238,10 +1371,9 @@ from imports import *
                     dep_category = None
                     if dep in self.module_mapping:
                         dep_path = self.module_mapping[dep]
-                        rel_path = os.path.relpath(dep_path, self.target_dir)
-                        parts = rel_path.split(os.sep)
-                        if len(parts) >= 2:
-                            dep_category = parts[0]
+                        location = self._module_location(dep_path)
+                        if location:
+                            dep_category = location[0]
                     else:
                         # Проверяем, является ли зависимость функцией из utils
                         if self.structure and 'functions' in self.structure:
@@ -1287,21 +1419,21 @@ from imports import *
                 if target_cat != category:
                     has_cycle_to(category, target_cat, [])
         
-        # Импортируем из всех категорий проекта
+        # Импортируем из всех категорий проекта (их директории созданы в _create_structure).
+        # Порядок сортированный, а не порядок обхода множества: иначе содержимое
+        # __init__.py менялось бы между запусками и файл перезаписывался бы каждый раз
         # Для категорий с циклическими зависимостями НЕ импортируем в __init__.py
         # Они будут импортированы напрямую из модулей там, где нужны
-        for category in self.project_categories:
-            category_dir = os.path.join(self.target_dir, category)
-            if os.path.exists(category_dir):
-                if category in categories_with_cycles:
-                    # Не импортируем категории с циклическими зависимостями в __init__.py
-                    # Они будут импортированы напрямую из модулей там, где нужны
-                    code += f"# Категория {category} имеет циклические зависимости - не импортируем в __init__.py\n"
-                    code += f"# Импортируйте классы напрямую: from {category}.module_name import ClassName\n\n"
-                else:
-                    code += f"from .{category} import *\n"
+        for category in sorted(self.project_categories):
+            if category in categories_with_cycles:
+                # Не импортируем категории с циклическими зависимостями в __init__.py
+                # Они будут импортированы напрямую из модулей там, где нужны
+                code_parts.append(f"# Категория {category} имеет циклические зависимости - не импортируем в __init__.py\n")
+                code_parts.append(f"# Импортируйте классы напрямую: from {category}.module_name import ClassName\n\n")
+            else:
+                code_parts.append(f"from .{category} import *\n")
         
-        return code
+        return ''.join(code_parts)
     
     def _save_metadata(self) -> bool:
         """Сохранение метаданных"""
@@ -1310,22 +1442,48 @@ from imports import *
                 'source_file': self.source_file,
                 'source_name': self.source_name,
                 'target_dir': self.target_dir,
-                'structure': self.structure,
+                'structure': self._metadata_structure(),
                 'module_mapping': self.module_mapping,
                 'total_classes': len(self.structure.get('classes', [])),
                 'total_functions': len(self.structure.get('functions', [])),
                 'total_imports': len(self.structure.get('imports', []))
             }
             
+            # Метаданные содержат всю структуру исходника: через orjson (если он
+            # установлен) запись в разы быстрее, формат тот же (UTF-8, отступ 2)
             metadata_path = os.path.join(self.metadata_dir, 'metadata.json')
-            with open(metadata_path, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
+            if _json_fast is not None:
+                with open(metadata_path, 'wb') as f:
+                    f.write(_json_fast.dumps(metadata, option=_json_fast.OPT_INDENT_2))
+            else:
+                with open(metadata_path, 'w', encoding='utf-8') as f:
+                    json.dump(metadata, f, indent=2, ensure_ascii=False)
             
             return True
         except Exception as e:
             print(f"[ERROR] Ошибка сохранения метаданных: {e}")
             return False
     
+    def _metadata_structure(self) -> Dict[str, Any]:
+        """
+        Структура для metadata.json без исходного кода компонентов
+        
+        Сборщику из метаданных нужны только имена, базовые классы и использования
+        (граф зависимостей); код уже лежит в модулях, а полная структура - в кэше
+        структуры. Без тел классов и функций исходник не сериализуется второй раз.
+        
+        Returns:
+            Dict: Копия структуры, в которой у классов, функций и констант нет 'code'
+        """
+        structure = dict(self.structure)
+        for group in ('classes', 'functions', 'constants'):
+            if group in structure:
+                structure[group] = [
+                    {key: value for key, value in component.items() if key != 'code'}
+                    for component in structure[group]
+                ]
+        return structure
+    
     def _generate_launcher_file(self) -> bool:
         """Генерация файла запуска разобранного проекта"""
         try:
@@ -1335,8 +1493,8 @@ from imports import *
             # Создаем файл в директории модулей (независимо от исходного проекта)
             launcher_path = os.path.join(self.target_dir, launcher_name)
             
-            # Генерируем код файла запуска
-            launcher_code = f'''#!/usr/bin/env python
+            # Генерируем код файла запуска (шаблон - f-строка, компилируется один раз)
+            launcher_parts = [f'''#!/usr/bin/env python
 # -*- coding: utf-8 -*-
 """
 Файл запуска разобранного проекта
@@ -1355,60 +1513,56 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # КРИТИЧЕСКИ ВАЖНО: Сначала импортируем imports.py
 # Это переопределяет print (если есть) и делает доступными все импорты и константы
-    from imports import *
+from imports import *
 
-'''
+''']
             
             # Импортируем все классы В ТОЧНОМ ПОРЯДКЕ, как в исходном файле
+            classes = self.structure.get('classes', [])
             class_order = getattr(self, 'class_order', [])
             if not class_order:
                 # Fallback: используем порядок из структуры
-                class_order = [cls['name'] for cls in self.structure.get('classes', [])]
+                class_order = [cls['name'] for cls in classes]
             
+            # Категории классов по имени: один проход вместо поиска класса
+            # в структуре для каждого имени
+            class_categories = {cls['name']: self._class_category(cls) for cls in classes}
             for class_name in class_order:
-                # Находим категорию класса
-                category = None
-                for cls in self.structure.get('classes', []):
-                    if cls['name'] == class_name:
-                        category = self._determine_category(cls)
-                        break
-                
+                category = class_categories.get(class_name)
                 if category:
                     # Импортируем класс: from category.ClassName import ClassName
-                    launcher_code += f"from {category}.{class_name} import {class_name}\n"
+                    launcher_parts.append(f"from {category}.{class_name} import {class_name}\n")
             
-            launcher_code += '\n'
+            launcher_parts.append('\n')
             
             # Импортируем init.py для инициализации глобальных переменных (после импорта всех классов)
             if hasattr(self, 'global_init') and self.global_init:
-                launcher_code += '''# Инициализация глобальных переменных (создание экземпляров классов)
+                launcher_parts.append('''# Инициализация глобальных переменных (создание экземпляров классов)
 # ВАЖНО: Это выполняется ПОСЛЕ импорта всех классов
 from init import *
 
-'''
+''')
             
             # Импортируем main из utils.main
-            launcher_code += '''# Импортируем main из utils.main
-        try:
+            launcher_parts.append('''# Импортируем main из utils.main
+try:
     from utils.main import main
 except ImportError:
     print("[ERROR] Не удалось импортировать main из utils.main")
-        sys.exit(1)
+    sys.exit(1)
 
 if __name__ == '__main__':
     main()
-'''
+''')
+            launcher_code = ''.join(launcher_parts)
             
             # Записываем файл запуска
-            with open(launcher_path, 'w', encoding='utf-8') as f:
-                f.write(launcher_code)
+            _write_if_changed(launcher_path, launcher_code)
             
             print(f"[REBUILD] Создан файл запуска: {launcher_path}")
             return True
-        except Exception as e:
-            print(f"[ERROR] Ошибка генерации файла запуска: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Ошибка генерации файла запуска")
             return False
     
     def _replace_internal_imports(self, code: str, current_category: str, component_name: str) -> str:
@@ -1423,8 +1577,6 @@ if __name__ == '__main__':
         Returns:
             str: Код с замененными импортами
         """
-        import re
-        
         # Получаем имя исходного модуля
         source_module = self.source_module_name
         
@@ -1432,11 +1584,10 @@ if __name__ == '__main__':
         class_to_module = {}
         for cls_name, module_path in self.module_mapping.items():
             # Извлекаем категорию и имя модуля из пути
-            rel_path = os.path.relpath(module_path, self.target_dir)
-            parts = rel_path.split(os.sep)
-            if len(parts) >= 2:
-                category = parts[0]
-                module_file = parts[1]
+            location = self._module_location(module_path)
+            if location:
+                category = location[0]
+                module_file = location[1]
                 module_name = os.path.splitext(module_file)[0]
                 class_to_module[cls_name] = (category, module_name)
         
@@ -1603,20 +1754,16 @@ if __name__ == '__main__':
     
     def _replace_imports_in_all_modules(self) -> None:
         """Замена внутренних импортов во всех созданных модулях"""
-        import re
-        
         # Обрабатываем все модули классов
         for class_name, module_path in self.module_mapping.items():
             try:
-                # Читаем файл
-                with open(module_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                # Содержимое модуля из первого прохода
+                content = self._staged_files[module_path]
                 
                 # Извлекаем категорию и имя модуля из пути
-                rel_path = os.path.relpath(module_path, self.target_dir)
-                parts = rel_path.split(os.sep)
-                if len(parts) >= 2:
-                    category = parts[0]
+                location = self._module_location(module_path)
+                if location:
+                    category = location[0]
                     
                     # Заменяем импорты
                     processed_content = self._replace_internal_imports(content, category, class_name)
@@ -1635,31 +1782,26 @@ if __name__ == '__main__':
                     # Удаляем циклические импорты функций из runner_functions.py (если они были добавлены)
                     if category == 'core' or category == 'handlers' or category == 'managers' or category == 'analyzers' or category == 'gui' or category == 'loggers':
                         # Удаляем импорты функций из runner_functions.py из классов (они не должны быть там)
-                        import re
-                        pattern = re.compile(r'from\s+utils\.runner_functions\s+import\s+\w+')
-                        processed_content = pattern.sub('', processed_content)
+                        processed_content = _RUNNER_FUNCTIONS_IMPORT_RE.sub('', processed_content)
                     
                     # Сохраняем обратно
-                    with open(module_path, 'w', encoding='utf-8') as f:
-                        f.write(processed_content)
+                    self._staged_files[module_path] = processed_content
             except Exception as e:
                 print(f"[WARNING] Не удалось обработать импорты в {module_path}: {e}")
         
         # Обрабатываем utils.py
         utils_path = os.path.join(self.target_dir, 'utils', 'utils.py')
-        if os.path.exists(utils_path):
+        if utils_path in self._staged_files:
             try:
-                with open(utils_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                content = self._staged_files[utils_path]
                 
                 # Для utils.py используем имя файла как component_name для проверки циклических зависимостей
                 processed_content = self._replace_internal_imports(content, 'utils', 'utils')
                 
                 # Удаляем прямые импорты классов из utils.utils (они создают циклические зависимости)
                 # utils.utils НЕ должен импортировать классы напрямую - используем отложенный импорт
-                import re
                 # Удаляем импорты классов (например, from core.UniversalProcessRunner import UniversalProcessRunner)
-                class_import_pattern = re.compile(r'^from\s+(\w+)\.(\w+)\s+import\s+(\w+)\s*$', re.MULTILINE)
+                class_import_pattern = _CATEGORY_IMPORT_RE
                 lines = processed_content.split('\n')
                 filtered_lines = []
                 for line in lines:
@@ -1678,9 +1820,8 @@ if __name__ == '__main__':
                 
                 # Удаляем прямые импорты классов из utils.utils ЕЩЕ РАЗ (на случай если _add_missing_imports их добавил)
                 # utils.utils НЕ должен импортировать классы напрямую - используем отложенный импорт
-                import re
                 # Удаляем импорты классов (например, from core.UniversalProcessRunner import UniversalProcessRunner)
-                class_import_pattern = re.compile(r'^from\s+(\w+)\.(\w+)\s+import\s+(\w+)\s*$', re.MULTILINE)
+                class_import_pattern = _CATEGORY_IMPORT_RE
                 lines = processed_content.split('\n')
                 filtered_lines = []
                 for line in lines:
@@ -1698,17 +1839,15 @@ if __name__ == '__main__':
                 # Заменяем импорты из config на imports
                 processed_content = self._replace_config_imports(processed_content)
                 
-                with open(utils_path, 'w', encoding='utf-8') as f:
-                    f.write(processed_content)
+                self._staged_files[utils_path] = processed_content
             except Exception as e:
                 print(f"[WARNING] Не удалось обработать импорты в {utils_path}: {e}")
         
         # Обрабатываем utils/main.py
         main_path = os.path.join(self.target_dir, 'utils', 'main.py')
-        if os.path.exists(main_path):
+        if main_path in self._staged_files:
             try:
-                with open(main_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                content = self._staged_files[main_path]
                 
                 # Разделяем на части: до from imports import * и после
                 parts = content.split('from imports import *')
@@ -1732,17 +1871,15 @@ if __name__ == '__main__':
                     # Заменяем импорты из config на imports
                     processed_content = self._replace_config_imports(processed_content)
                 
-                with open(main_path, 'w', encoding='utf-8') as f:
-                    f.write(processed_content)
+                self._staged_files[main_path] = processed_content
             except Exception as e:
                 print(f"[WARNING] Не удалось обработать импорты в {main_path}: {e}")
         
         # Обрабатываем utils/runner_functions.py
         runner_path = os.path.join(self.target_dir, 'utils', 'runner_functions.py')
-        if os.path.exists(runner_path):
+        if runner_path in self._staged_files:
             try:
-                with open(runner_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                content = self._staged_files[runner_path]
                 
                 processed_content = self._replace_internal_imports(content, 'utils', 'runner_functions')
                 # Добавляем недостающие импорты для runner_functions.py (но не добавляем импорты функций из него самого)
@@ -1751,32 +1888,28 @@ if __name__ == '__main__':
                 # Заменяем импорты из config на imports
                 processed_content = self._replace_config_imports(processed_content)
                 
-                with open(runner_path, 'w', encoding='utf-8') as f:
-                    f.write(processed_content)
+                self._staged_files[runner_path] = processed_content
             except Exception as e:
                 print(f"[WARNING] Не удалось обработать импорты в {runner_path}: {e}")
         
         # Обрабатываем utils/cleanup.py
         cleanup_path = os.path.join(self.target_dir, 'utils', 'cleanup.py')
-        if os.path.exists(cleanup_path):
+        if cleanup_path in self._staged_files:
             try:
-                with open(cleanup_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                content = self._staged_files[cleanup_path]
                 
                 processed_content = self._replace_internal_imports(content, 'utils', 'cleanup')
                 processed_content = self._add_missing_imports(processed_content, 'utils', 'cleanup')
                 # Заменяем импорты из config на imports
                 processed_content = self._replace_config_imports(processed_content)
                 
-                with open(cleanup_path, 'w', encoding='utf-8') as f:
-                    f.write(processed_content)
+                self._staged_files[cleanup_path] = processed_content
             except Exception as e:
                 print(f"[WARNING] Не удалось обработать импорты в {cleanup_path}: {e}")
     
     def _add_missing_imports(self, content: str, category: str, component_name: str) -> str:
         """Добавление недостающих импортов на основе анализа кода через AST"""
         import ast
-        import re
         
         try:
             # Парсим код в AST
@@ -1864,7 +1997,6 @@ if __name__ == '__main__':
                                 # Есть циклическая зависимость - используем отложенный импорт
                                 print(f"[REBUILD] Обнаружена циклическая зависимость между {component_name} и {decorator}, используем отложенный импорт")
                                 # Удаляем прямой импорт
-                                import re
                                 import_pattern = re.compile(rf'from\s+utils\.utils\s+import\s+{re.escape(decorator)}\b')
                                 content = import_pattern.sub(f'# Отложенный импорт для избежания циклических зависимостей\n# from utils.utils import {decorator}', content)
                                 # Удаляем декораторы на уровне модуля - они будут применены при первом вызове метода
@@ -1898,7 +2030,6 @@ if __name__ == '__main__':
                                     # Есть циклическая зависимость - используем отложенный импорт
                                     print(f"[REBUILD] Обнаружена циклическая зависимость между {component_name} и {decorator}, используем отложенный импорт")
                                     # Удаляем прямой импорт, если он есть
-                                    import re
                                     import_pattern = re.compile(rf'from\s+utils\.utils\s+import\s+{re.escape(decorator)}\b')
                                     content = import_pattern.sub(f'# Отложенный импорт для избежания циклических зависимостей\n# from utils.utils import {decorator}', content)
                                     continue
@@ -1920,11 +2051,10 @@ if __name__ == '__main__':
                 if base_class in self.module_mapping:
                     # Определяем категорию и модуль
                     module_path = self.module_mapping[base_class]
-                    rel_path = os.path.relpath(module_path, self.target_dir)
-                    parts = rel_path.split(os.sep)
-                    if len(parts) >= 2:
-                        base_category = parts[0]
-                        base_module_file = parts[1]
+                    location = self._module_location(module_path)
+                    if location:
+                        base_category = location[0]
+                        base_module_file = location[1]
                         base_module_name = os.path.splitext(base_module_file)[0]
                         
                         # Проверяем, не пытаемся ли мы импортировать класс из самого себя (циклический импорт)
@@ -1956,11 +2086,10 @@ if __name__ == '__main__':
                 if used_name in self.module_mapping:
                     # Определяем категорию и модуль
                     module_path = self.module_mapping[used_name]
-                    rel_path = os.path.relpath(module_path, self.target_dir)
-                    parts = rel_path.split(os.sep)
-                    if len(parts) >= 2:
-                        used_category = parts[0]
-                        used_module_file = parts[1]
+                    location = self._module_location(module_path)
+                    if location:
+                        used_category = location[0]
+                        used_module_file = location[1]
                         used_module_name = os.path.splitext(used_module_file)[0]
                         
                         # Проверяем, не пытаемся ли мы импортировать класс из самого себя (циклический импорт)
@@ -1978,7 +2107,6 @@ if __name__ == '__main__':
                             # Заменяем использование на вызов функции с отложенным импортом
                             content = self._replace_with_lazy_import(content, used_name, used_category, used_module_name)
                             # Также удаляем импорт на уровне модуля, если он есть
-                            import re
                             import_pattern = re.compile(rf'from\s+{re.escape(used_category)}\.{re.escape(used_module_name)}\s+import\s+{re.escape(used_name)}\b')
                             content = import_pattern.sub('', content)
                             # НЕ добавляем импорт в imports_to_add
@@ -2006,7 +2134,6 @@ if __name__ == '__main__':
                                 # Циклическая зависимость - используем отложенный импорт
                                 print(f"[REBUILD] Обнаружена циклическая зависимость между utils.utils и {used_name}, используем отложенный импорт")
                                 content = self._replace_with_lazy_import(content, used_name, used_category, used_module_name)
-                                import re
                                 import_pattern = re.compile(rf'from\s+{re.escape(used_category)}\.{re.escape(used_module_name)}\s+import\s+{re.escape(used_name)}\b')
                                 content = import_pattern.sub('', content)
                                 continue
@@ -2023,7 +2150,6 @@ if __name__ == '__main__':
                             # Поэтому для utils.utils ВСЕГДА используем отложенный импорт для классов
                             print(f"[REBUILD] Обнаружена попытка импорта класса {used_name} в utils.utils - используем отложенный импорт для избежания циклических зависимостей")
                             content = self._replace_with_lazy_import(content, used_name, used_category, used_module_name)
-                            import re
                             import_pattern = re.compile(rf'from\s+{re.escape(used_category)}\.{re.escape(used_module_name)}\s+import\s+{re.escape(used_name)}\b')
                             content = import_pattern.sub('', content)
                             continue
@@ -2193,7 +2319,6 @@ if __name__ == '__main__':
                     imports_to_add.append('from imports import APP_VERSION')
             
             # Удаляем gui_log=True из print() вызовов
-            import re
             # Удаляем gui_log=True в любом месте аргументов print()
             content = re.sub(r',\s*gui_log=True', '', content)
             content = re.sub(r'gui_log=True\s*,', '', content)
@@ -2303,11 +2428,10 @@ if __name__ == '__main__':
                     if class_name in self.module_mapping:
                         # Определяем категорию и модуль
                         module_path = self.module_mapping[class_name]
-                        rel_path = os.path.relpath(module_path, self.target_dir)
-                        parts = rel_path.split(os.sep)
-                        if len(parts) >= 2:
-                            category = parts[0]
-                            module_file = parts[1]
+                        location = self._module_location(module_path)
+                        if location:
+                            category = location[0]
+                            module_file = location[1]
                             module_name = os.path.splitext(module_file)[0]
                             
                             # Проверяем, есть ли уже импорт
@@ -2402,7 +2526,6 @@ if __name__ == '__main__':
             str: Код с отложенными декораторами
         """
         import ast
-        import re
         
         try:
             # Определяем функции из utils для проверки декораторов
@@ -2540,8 +2663,6 @@ def _get_{decorator_name}():
     
     def _remove_circular_function_imports(self, content: str, category: str, component_name: str) -> str:
         """Удаление циклических импортов функций из utils.utils"""
-        import re
-        
         if not self.structure or 'functions' not in self.structure:
             return content
         
@@ -2596,8 +2717,6 @@ def _get_{decorator_name}():
         Returns:
             str: Код с замененными использованиями на отложенные импорты
         """
-        import re
-        
         # Создаем функцию для отложенного импорта
         lazy_import_func = f'''
 def _get_{class_name.lower()}():
@@ -2708,16 +2827,12 @@ def _get_{class_name.lower()}():
         Returns:
             str: Код с замененными импортами
         """
-        import re
-        
         # Заменяем from config import ... на from imports import ...
-        pattern = re.compile(r'from\s+config\s+import\s+(\w+)')
-        content = pattern.sub(r'from imports import \1', content)
+        content = _CONFIG_FROM_IMPORT_RE.sub(r'from imports import \1', content)
         
         # Заменяем import config на from imports import * (если нужно)
         # Но обычно это не используется, поэтому просто удаляем
-        pattern_import = re.compile(r'^import\s+config\b', re.MULTILINE)
-        content = pattern_import.sub('', content)
+        content = _CONFIG_IMPORT_RE.sub('', content)
         
         return content
 
@@ -16,6 +16,15 @@ import shutil
 from typing import Dict, List, Tuple, Optional, Set, Any
 from .parser import CodeParser
 
+# Простой импорт: import module[, module...]
+_IMPORT_RE = re.compile(r'^import\s+(\w+(?:\s*,\s*\w+)*)')
+
+# Импорт from: from module import name[, name...]
+_FROM_IMPORT_RE = re.compile(r'^from\s+(\S+)\s+import\s+(.+)')
+
+# Вызов конструктора в присваивании: name = ClassName(...)
+_CONSTRUCTOR_CALL_RE = re.compile(r'=\s*(\w+)\s*\(')
+
 
 class SimpleRebuilder:
     """Упрощенный разборщик проектов
@@ -539,7 +548,7 @@ class SimpleRebuilder:
         imports = []
         
         # Простой импорт: import module
-        match = re.match(r'^import\s+(\w+(?:\s*,\s*\w+)*)', line)
+        match = _IMPORT_RE.match(line)
         if match:
             modules = [m.strip() for m in match.group(1).split(',')]
             for module in modules:
@@ -552,7 +561,7 @@ class SimpleRebuilder:
             return imports
         
         # Импорт from: from module import name
-        match = re.match(r'^from\s+(\S+)\s+import\s+(.+)', line)
+        match = _FROM_IMPORT_RE.match(line)
         if match:
             module = match.group(1)
             names = match.group(2)
@@ -600,12 +609,15 @@ class SimpleRebuilder:
         """Извлечение импортов через regex (fallback)"""
         imports = []
         lines = code.split('\n')
+        # Методы скомпилированных шаблонов - локальные имена для цикла по строкам
+        match_import = _IMPORT_RE.match
+        match_from_import = _FROM_IMPORT_RE.match
         
         for i, line in enumerate(lines, 1):
             stripped = line.strip()
             
             # Простой импорт
-            match = re.match(r'^import\s+(\w+(?:\s*,\s*\w+)*)', stripped)
+            match = match_import(stripped)
             if match:
                 modules = [m.strip() for m in match.group(1).split(',')]
                 for module in modules:
@@ -617,7 +629,7 @@ class SimpleRebuilder:
                     })
             
             # Импорт from
-            match = re.match(r'^from\s+(\S+)\s+import\s+(.+)', stripped)
+            match = match_from_import(stripped)
             if match:
                 module = match.group(1)
                 names = match.group(2)
@@ -920,7 +932,7 @@ class SimpleRebuilder:
             # Проверяем, является ли это инициализацией экземпляра класса
             if '(' in code and '=' in code:
                 # Пытаемся найти вызов конструктора класса
-                match = re.search(r'=\s*(\w+)\s*\(', code)
+                match = _CONSTRUCTOR_CALL_RE.search(code)
                 if match:
                     class_name = match.group(1)
                     # Это глобальная переменная с экземпляром класса
@@ -1623,10 +1635,16 @@ class SimpleRebuilder:
     
     def _normalize_indentation(self, code: str) -> str:
         """Нормализация отступов в коде"""
-        lines = code.split('\n')
-        if not lines:
+        # Быстрый путь: первая строка без отступа, значит минимальный отступ 0
+        if not code or not code[0].isspace():
             return code
         
+        # Быстрый путь для однострочного кода (например, константы)
+        if '\n' not in code:
+            return code.lstrip() if code.strip() else code
+        
+        lines = code.split('\n')
+        
         # Находим минимальный отступ (игнорируем пустые строки)
         min_indent = None
         for line in lines:
@@ -15,6 +15,7 @@ import argparse
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from config import APP_VERSION
+from core.parser import enable_console_logging
 from core.rebuilder import Rebuilder, rebuild_file
 
 
@@ -46,6 +47,7 @@ def main():
     )
     
     args = parser.parse_args()
+    enable_console_logging()
     
     print("=" * 60)
     print(f"FSA-ProjectBuilder - Разборка на модули")
@@ -84,6 +84,90 @@ def test_function():
             py_compile.compile(output_file, doraise=True)
         except py_compile.PyCompileError as e:
             self.fail(f"Собранный файл содержит синтаксические ошибки: {e}")
+    
+    def test_build_parse_cache(self):
+        """Тест кэша разобранных модулей между сборками"""
+        first_output = os.path.join(self.test_dir, 'first_built.py')
+        second_output = os.path.join(self.test_dir, 'second_built.py')
+        self.assertTrue(build_modules(self.modules_dir, first_output))
+        
+        cache_file = os.path.join(self.modules_dir, '.metadata', 'parse_cache.json')
+        self.assertTrue(os.path.exists(cache_file), "Кэш модулей должен быть сохранен")
+        order_cache_file = os.path.join(self.modules_dir, '.metadata', 'order_cache.json')
+        self.assertTrue(os.path.exists(order_cache_file), "Кэш порядка модулей должен быть сохранен")
+        
+        # Повторная сборка берет неизмененные модули из кэша
+        builder = Builder(self.modules_dir, second_output)
+        self.assertTrue(builder._parse_cache, "Кэш должен загружаться при создании сборщика")
+        self.assertTrue(builder.build())
+        
+        # Порядок из кэша совпадает с вычисленным заново
+        os.remove(order_cache_file)
+        fresh_builder = Builder(self.modules_dir, first_output)
+        fresh_builder._load_metadata()
+        fresh_builder._determine_load_order()
+        self.assertEqual(builder.modules_order, fresh_builder.modules_order)
+        
+        with open(first_output, 'r', encoding='utf-8') as f:
+            first = f.read()
+        with open(second_output, 'r', encoding='utf-8') as f:
+            second = f.read()
+        self.assertEqual(first, second, "Сборка из кэша должна совпадать с обычной")
+    
+    def test_build_cleanup(self):
+        """Тест очистки пустых строк и пробелов при сборке"""
+        output_file = os.path.join(self.test_dir, 'test_built.py')
+        config = {
+            'cleanup': {
+                'remove_empty_lines': True,
+                'max_empty_lines': 1,
+                'remove_trailing_whitespace': True
+            }
+        }
+        self.assertTrue(build_modules(self.modules_dir, output_file, config))
+        
+        with open(output_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        self.assertIn('TestClass', content)
+        self.assertNotIn('\n\n\n', content, "Не более одной пустой строки подряд")
+        for line in content.split('\n'):
+            self.assertEqual(line, line.rstrip(), "Строки без пробелов в конце")
+    
+    def test_build_many_modules(self):
+        """Тест сборки большого числа модулей (параллельный разбор)"""
+        many_dir = os.path.join(self.test_dir, 'many')
+        os.makedirs(os.path.join(many_dir, 'utils'))
+        for i in range(40):
+            with open(os.path.join(many_dir, 'utils', f'func_{i:02d}.py'), 'w', encoding='utf-8') as f:
+                f.write(f'import os\n\n\ndef func_{i:02d}():\n    """Функция {i}"""\n    return os.sep\n')
+        
+        output_file = os.path.join(self.test_dir, 'many_built.py')
+        self.assertTrue(build_modules(many_dir, output_file))
+        
+        with open(output_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        self.assertEqual(content.count('import os\n'), 1, "Импорт должен быть вынесен один раз")
+        positions = [content.index(f'def func_{i:02d}()') for i in range(40)]
+        self.assertEqual(positions, sorted(positions), "Порядок модулей должен сохраняться")
+    
+    def test_save_output_keeps_previous_on_error(self):
+        """Тест: ошибка генерации кода не портит результат прошлой сборки"""
+        output_file = os.path.join(self.test_dir, 'test_built.py')
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write('previous\n')
+        
+        def failing_code():
+            yield 'partial\n'
+            raise RuntimeError('generator failed')
+        
+        builder = Builder(self.modules_dir, output_file)
+        self.assertFalse(builder._save_output(failing_code()))
+        
+        with open(output_file, 'r', encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'previous\n')
+        self.assertFalse(os.path.exists(output_file + '.tmp'), "Временный файл должен быть удален")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Тесты для разрешения зависимостей между компонентами
+"""
+
+import os
+import sys
+import unittest
+
+# Добавляем путь к модулям проекта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.dependency_resolver import DependencyResolver
+
+
+class TestDependencyResolver(unittest.TestCase):
+    """Тесты для разрешения зависимостей"""
+    
+    def setUp(self):
+        """Подготовка тестовой структуры"""
+        self.structure = {
+            'classes': [
+                {'name': 'Base', 'bases': [], 'code': 'class Base:\n    pass\n'},
+                {'name': 'Child', 'bases': ['Base'], 'code': 'class Child(Base):\n    pass\n'},
+                {'name': 'Manager', 'bases': [], 'code': 'class Manager:\n    def run(self):\n        return Child()\n'}
+            ],
+            'functions': [
+                {'name': 'main', 'code': 'def main():\n    Manager().run()\n'}
+            ],
+            'constants': [],
+            'usages': {
+                'Child': ['Base'],
+                'Manager': ['Child'],
+                'main': ['Manager']
+            }
+        }
+    
+    def test_resolve(self):
+        """Тест определения зависимостей компонентов"""
+        resolver = DependencyResolver(self.structure)
+        dependencies = resolver.resolve()
+        
+        self.assertEqual(dependencies['Base'], frozenset())
+        self.assertEqual(dependencies['Child'], frozenset({'Base'}))
+        self.assertEqual(dependencies['Manager'], frozenset({'Child'}))
+        self.assertEqual(dependencies['main'], frozenset({'Manager'}))
+        self.assertIsInstance(dependencies['Child'], frozenset)
+    
+    def test_module_dependencies(self):
+        """Тест переноса зависимостей на уровень модулей"""
+        resolver = DependencyResolver(self.structure)
+        resolver.resolve()
+        module_dependencies = resolver.get_module_dependencies({
+            'Base': 'models/base.py',
+            'Child': 'models/child.py',
+            'Manager': 'managers/manager.py'
+        })
+        
+        self.assertEqual(module_dependencies, {
+            'models/base.py': set(),
+            'models/child.py': {'models/base.py'},
+            'managers/manager.py': {'models/child.py'}
+        })
+    
+    def test_topological_levels(self):
+        """Тест разбиения графа на уровни"""
+        levels = DependencyResolver.topological_levels({
+            'a': set(),
+            'b': {'a'},
+            'c': {'a'},
+            'd': {'b', 'c'}
+        })
+        
+        self.assertEqual([sorted(level) for level in levels], [['a'], ['b', 'c'], ['d']])
+    
+    def test_topological_levels_cycle(self):
+        """Тест уровней при циклической зависимости"""
+        levels = DependencyResolver.topological_levels({
+            'a': set(),
+            'b': {'a', 'c'},
+            'c': {'b'}
+        })
+        
+        self.assertEqual(levels[0], ['a'])
+        self.assertEqual(sorted(levels[-1]), ['b', 'c'])
+    
+    def test_chain_metrics(self):
+        """Тест длины цепочки зависимых и числа зависимых"""
+        metrics = DependencyResolver.chain_metrics({
+            'a': set(),
+            'b': {'a'},
+            'c': {'a'},
+            'd': {'b'}
+        })
+        
+        self.assertEqual(metrics['a'], (3, 2))
+        self.assertEqual(metrics['b'], (2, 1))
+        self.assertEqual(metrics['c'], (1, 0))
+        self.assertEqual(metrics['d'], (1, 0))
+    
+    def test_deep_chain(self):
+        """Тест длинной цепочки зависимостей (без переполнения стека)"""
+        resolver = DependencyResolver({})
+        names = [f'c{i}' for i in range(5000)]
+        resolver.dependencies = {name: [names[i - 1]] if i else [] for i, name in enumerate(names)}
+        
+        self.assertEqual(resolver.get_load_order(), names)
+        self.assertEqual(resolver.detect_cycles(), [])
+    
+    def test_load_order(self):
+        """Тест порядка загрузки: зависимости раньше зависимых"""
+        resolver = DependencyResolver(self.structure)
+        resolver.resolve()
+        
+        self.assertEqual(resolver.get_load_order(), ['Base', 'Child', 'Manager', 'main'])
+    
+    def test_detect_cycles(self):
+        """Тест обнаружения циклической зависимости"""
+        resolver = DependencyResolver({})
+        resolver.dependencies = {'a': ['b'], 'b': ['c'], 'c': ['a']}
+        
+        self.assertEqual(resolver.detect_cycles(), [['a', 'b', 'c', 'a']])
+
+
+if __name__ == '__main__':
+    unittest.main()
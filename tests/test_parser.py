@@ -8,12 +8,14 @@ FSA-ProjectBuilder - Тесты парсера
 from __future__ import print_function
 import sys
 import os
+import json
 import tempfile
+import shutil
 
 # Добавляем путь к модулям проекта
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.parser import CodeParser, parse_file
+from core.parser import CodeParser, parse_file, parse_files, PROCESS_POOL_MIN_FILES
 
 
 def test_simple_file():
@@ -66,6 +68,20 @@ class TestClass:
         imports = structure['imports']
         assert len(imports) >= 2
         
+        # Структура без кода компонентов (только имена, строки, использования)
+        light = parser.get_structure(include_source=False)
+        assert 'code' not in light['classes'][0] and 'code' not in light['constants'][0]
+        assert light['usages'] == structure['usages']
+        
+        # Код компонента доступен и срезом по требованию
+        assert parser.get_code(classes[0]['start_line'], classes[0]['end_line']) == classes[0]['code']
+        
+        # После освобождения парсера структура остается полной
+        parser.release()
+        assert parser.source_code is None and parser.ast_tree is None
+        assert parser.get_classes() == []
+        assert 'class TestClass' in classes[0]['code']
+        
         print("[OK] Тест парсинга простого файла пройден")
         
     finally:
@@ -93,6 +109,174 @@ class Test:
         os.unlink(temp_path)
 
 
+def test_function_named_as_method():
+    """Тест функции верхнего уровня с именем, как у метода класса"""
+    test_code = '''
+class Runner:
+    def run(self):
+        def helper():
+            pass
+        return helper
+
+def run():
+    return Runner().run()
+'''
+    
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
+        f.write(test_code)
+        temp_path = f.name
+    
+    try:
+        structure = parse_file(temp_path)
+        functions = structure['functions']
+        assert [func['name'] for func in functions] == ['run'], "Методы и вложенные функции не входят в функции"
+        assert functions[0]['start_line'] == 8
+        print("[OK] Тест функции с именем метода пройден")
+        
+    finally:
+        os.unlink(temp_path)
+
+
+def test_nested_imports():
+    """Тест импортов внутри функций, классов и обработчиков исключений"""
+    test_code = '''
+import os
+
+try:
+    import json
+except ImportError:
+    json = None
+    from simplejson import loads
+
+class Loader:
+    def load(self):
+        import pickle
+        return [lambda: os.sep]
+
+def run():
+    if os.name:
+        from sys import argv
+'''
+    
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
+        f.write(test_code)
+        temp_path = f.name
+    
+    try:
+        parser = CodeParser(temp_path)
+        assert parser.parse()
+        imports = parser.get_imports()
+        assert [(imp['module'], imp['line']) for imp in imports] == [
+            ('os', 2), ('json', 5), ('simplejson', 8), ('pickle', 12), ('sys', 17)
+        ], "Импорты всех уровней в порядке ast.walk"
+        print("[OK] Тест вложенных импортов пройден")
+        
+    finally:
+        os.unlink(temp_path)
+
+
+def test_parse_files_function():
+    """Тест функции parse_files (параллельный парсинг)"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        paths = []
+        for i in range(PROCESS_POOL_MIN_FILES + 2):
+            path = os.path.join(temp_dir, f'module_{i}.py')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(f'class Test{i}:\n    pass\n')
+            paths.append(path)
+        broken_path = os.path.join(temp_dir, 'broken.py')
+        with open(broken_path, 'w', encoding='utf-8') as f:
+            f.write('def broken(:\n')
+        paths.append(broken_path)
+        
+        structures = parse_files(paths)
+        assert len(structures) == len(paths)
+        assert structures[-1] is None, "Файл с ошибкой дает None"
+        for i, structure in enumerate(structures[:-1]):
+            assert structure['classes'][0]['name'] == f'Test{i}', "Порядок результатов сохраняется"
+        assert parse_files(paths[:2]) == structures[:2]
+        assert parse_files(paths, workers=1) == structures, "Без пула результат тот же"
+        print("[OK] Тест функции parse_files пройден")
+        
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_parse_file_cache():
+    """Тест кэша структур неизмененных файлов"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, 'module.py')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('class Test:\n    pass\n')
+        cache_dir = os.path.join(temp_dir, '.fsa_cache')
+        
+        structure = parse_file(path, cache_dir=cache_dir)
+        cache_files = os.listdir(cache_dir)
+        assert len(cache_files) == 1, "Структура должна быть сохранена в кэш"
+        assert parse_file(path, cache_dir=cache_dir) == structure
+        
+        # Неизмененный файл берется из кэша без парсинга
+        cache_path = os.path.join(cache_dir, cache_files[0])
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        cache['structure']['total_lines'] = -1
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        assert parse_file(path, cache_dir=cache_dir)['total_lines'] == -1
+        
+        # Кэш, записанный другой версией Python, не используется
+        cache['key'][1] = [2, 7]
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        assert parse_file(path, cache_dir=cache_dir)['total_lines'] != -1
+        
+        # Измененный файл парсится заново
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('class Test:\n    pass\n\n\nclass Other:\n    pass\n')
+        structure = parse_file(path, cache_dir=cache_dir)
+        assert [cls['name'] for cls in structure['classes']] == ['Test', 'Other']
+        print("[OK] Тест кэша структур пройден")
+        
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_usages():
+    """Тест анализа использований компонентов"""
+    test_code = '''
+LIMIT = 10
+
+class Base:
+    pass
+
+class Child(Base):
+    """Не зависит от Handler, хотя упоминает его в строке"""
+    def run(self):
+        return "Handler"
+
+def handler_factory():
+    # Child упомянут только в комментарии
+    return Base() if LIMIT else None
+'''
+    
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
+        f.write(test_code)
+        temp_path = f.name
+    
+    try:
+        structure = parse_file(temp_path)
+        usages = structure['usages']
+        assert usages['Child'] == ['Base']
+        assert usages['handler_factory'] == ['Base', 'LIMIT']
+        assert 'Base' not in usages
+        print("[OK] Тест анализа использований пройден")
+        
+    finally:
+        os.unlink(temp_path)
+
+
 if __name__ == '__main__':
     print("Запуск тестов парсера...")
     print()
@@ -100,6 +284,11 @@ if __name__ == '__main__':
     try:
         test_simple_file()
         test_parse_file_function()
+        test_function_named_as_method()
+        test_nested_imports()
+        test_parse_files_function()
+        test_parse_file_cache()
+        test_usages()
         
         print()
         print("=" * 60)
@@ -103,6 +103,107 @@ if __name__ == '__main__':
         self.assertIn('source_file', metadata)
         self.assertIn('total_classes', metadata)
         self.assertIn('total_functions', metadata)
+        
+        # Код компонентов в метаданные не дублируется, граф зависимостей сохраняется
+        classes = metadata['structure']['classes']
+        self.assertTrue(classes)
+        self.assertTrue(all('code' not in cls and 'bases' in cls for cls in classes))
+        self.assertIn('usages', metadata['structure'])
+    
+    def test_class_name_to_module_name(self):
+        """Тест преобразования CamelCase -> snake_case"""
+        rebuilder = Rebuilder(self.test_file)
+        cases = {
+            'TestClass': 'test_class',
+            'HTTPServerHandler': 'http_server_handler',
+            'getHTTP2Response': 'get_http2_response',
+            'Tab2Widget': 'tab2_widget',
+            'Already_Snake': 'already__snake',
+            'A': 'a',
+            '': ''
+        }
+        for class_name, module_name in cases.items():
+            self.assertEqual(rebuilder._class_name_to_module_name(class_name), module_name)
+    
+    def test_rebuild_structure_cache(self):
+        """Тест кэша структуры неизмененного исходника"""
+        import json
+        output_dir = os.path.join(self.test_dir, 'modules')
+        rebuild_file(self.test_file, output_dir)
+        
+        cache_dir = os.path.join(output_dir, '.metadata', 'structure_cache')
+        cache_files = os.listdir(cache_dir)
+        self.assertEqual(len(cache_files), 1, "Структура исходника должна быть сохранена в кэш")
+        
+        # Побайтно тот же исходник берется из кэша, даже с новым mtime
+        cache_path = os.path.join(cache_dir, cache_files[0])
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        cache['structure']['total_lines'] = -1
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.utime(self.test_file, None)
+        
+        rebuilder = Rebuilder(self.test_file, output_dir)
+        rebuilder.rebuild()
+        self.assertEqual(rebuilder.structure['total_lines'], -1)
+        
+        # Измененный исходник парсится заново
+        with open(self.test_file, 'a', encoding='utf-8') as f:
+            f.write('\nEXTRA = 1\n')
+        rebuilder = Rebuilder(self.test_file, output_dir)
+        rebuilder.rebuild()
+        self.assertGreater(rebuilder.structure['total_lines'], 0)
+        self.assertIn('EXTRA', [const['name'] for const in rebuilder.structure['constants']])
+    
+    def test_rebuild_category_init(self):
+        """Тест __init__.py категорий по созданным модулям"""
+        output_dir = os.path.join(self.test_dir, 'modules')
+        
+        # Посторонний файл в директории категории не попадает в __init__.py
+        os.makedirs(os.path.join(output_dir, 'core'))
+        with open(os.path.join(output_dir, 'core', 'StaleModule.py'), 'w', encoding='utf-8') as f:
+            f.write('STALE = 1\n')
+        
+        rebuilder = Rebuilder(self.test_file, output_dir)
+        rebuilder.rebuild()
+        self.assertEqual(rebuilder._category_modules, {'core': ['TestClass'], 'utils': ['utils']})
+        
+        with open(os.path.join(output_dir, 'core', '__init__.py'), 'r', encoding='utf-8') as f:
+            init_code = f.read()
+        self.assertIn('from .TestClass import *', init_code)
+        self.assertNotIn('StaleModule', init_code)
+        
+        # Категории в главном __init__.py идут в стабильном (сортированном) порядке
+        with open(os.path.join(output_dir, '__init__.py'), 'r', encoding='utf-8') as f:
+            main_init_code = f.read()
+        self.assertLess(main_init_code.index('from .config import *'), main_init_code.index('from .core import *'))
+        self.assertLess(main_init_code.index('from .core import *'), main_init_code.index('from .utils import *'))
+    
+    def test_rebuild_keeps_unchanged_files(self):
+        """Тест повторной разборки: неизмененные файлы не перезаписываются"""
+        output_dir = os.path.join(self.test_dir, 'modules')
+        rebuild_file(self.test_file, output_dir)
+        
+        module_path = os.path.join(output_dir, 'core', 'TestClass.py')
+        utils_path = os.path.join(output_dir, 'utils', 'utils.py')
+        module_mtime = os.stat(module_path).st_mtime_ns
+        utils_mtime = os.stat(utils_path).st_mtime_ns
+        
+        # Повторная разборка того же исходника сохраняет mtime модулей
+        rebuild_file(self.test_file, output_dir)
+        self.assertEqual(os.stat(module_path).st_mtime_ns, module_mtime)
+        self.assertEqual(os.stat(utils_path).st_mtime_ns, utils_mtime)
+        
+        # Измененный класс перезаписывается, остальные модули - нет
+        with open(self.test_file, 'r', encoding='utf-8') as f:
+            source = f.read()
+        with open(self.test_file, 'w', encoding='utf-8') as f:
+            f.write(source.replace('self.value = 10', 'self.value = 20'))
+        rebuild_file(self.test_file, output_dir)
+        with open(module_path, 'r', encoding='utf-8') as f:
+            self.assertIn('self.value = 20', f.read())
+        self.assertEqual(os.stat(utils_path).st_mtime_ns, utils_mtime)
 
 
 if __name__ == '__main__':